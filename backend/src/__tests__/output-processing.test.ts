@@ -0,0 +1,171 @@
+/**
+ * 输出处理函数单元测试
+ *
+ * 测试内容：
+ * 1. extractTextContent - LLM 响应的代码块剔除（单次扫描版）
+ * 2. formatToolResults - 工具结果的先裁剪后序列化
+ * 3. sanitizeOutput - 敏感字段过滤（写时复制版）
+ */
+
+import { Types } from 'mongoose';
+import { extractTextContent } from '../ai/agent/parsers';
+import { formatToolResults } from '../ai/agent/tool-executor';
+import { sanitizeOutput } from '../ai/tools/executor';
+import type { ToolResult } from '../ai/tools/types';
+
+describe('extractTextContent', () => {
+    it('无代码块时原样返回（仅去首尾空白）', () => {
+        expect(extractTextContent('  你好，这是回答。\n')).toBe('你好，这是回答。');
+    });
+
+    it('保留普通代码块', () => {
+        const content = '示例：\n```json\n{"a": 1}\n```\n结束';
+        expect(extractTextContent(content)).toBe(content.trim());
+    });
+
+    it('剔除 tool_call 代码块', () => {
+        const content = '前文\n```tool_call\n{"toolId": "x"}\n```\n后文';
+        const result = extractTextContent(content);
+        expect(result).toContain('前文');
+        expect(result).toContain('后文');
+        expect(result).not.toContain('tool_call');
+        expect(result).not.toContain('toolId');
+    });
+
+    it('剔除 ui_form 与 predicted_actions 代码块', () => {
+        const content = '开头\n```ui_form\n{}\n```\n中间\n```predicted_actions\n[]\n```\n结尾';
+        const result = extractTextContent(content);
+        expect(result).toContain('开头');
+        expect(result).toContain('中间');
+        expect(result).toContain('结尾');
+        expect(result).not.toContain('ui_form');
+        expect(result).not.toContain('predicted_actions');
+    });
+
+    it('特殊代码块未闭合时丢弃剩余内容', () => {
+        const content = '前文\n```tool_call\n{"toolId": "x"}';
+        expect(extractTextContent(content)).toBe('前文');
+    });
+
+    it('普通代码块与特殊代码块混排', () => {
+        const content = '说明\n```sql\nSELECT 1\n```\n```tool_call\n{}\n```\n补充';
+        const result = extractTextContent(content);
+        expect(result).toContain('SELECT 1');
+        expect(result).toContain('补充');
+        expect(result).not.toContain('tool_call');
+    });
+});
+
+describe('formatToolResults', () => {
+    const ok = (toolId: string, data: any) => ({
+        toolId,
+        result: { success: true, data } as ToolResult,
+    });
+
+    it('失败结果输出错误消息', () => {
+        const output = formatToolResults([{
+            toolId: 'test.tool',
+            result: {
+                success: false,
+                error: {
+                    code: 'TEST_ERROR',
+                    message: '执行失败',
+                    reasonCode: 'ERROR_UNKNOWN',
+                    userMessage: '遇到了问题',
+                    canRetry: true,
+                },
+            } as ToolResult,
+        }]);
+        expect(output).toContain('[test.tool 错误]');
+        expect(output).toContain('执行失败');
+    });
+
+    it('超过 20 条的数组裁剪到前 20 条并附总数说明', () => {
+        const data = Array.from({ length: 50 }, (_, i) => ({ name: `客户${i}` }));
+        const output = formatToolResults([ok('clients.query', data)]);
+        expect(output).toContain('客户19');
+        expect(output).not.toContain('客户20');
+        expect(output).toContain('共 50 条');
+    });
+
+    it('contacts 字段裁剪到前 5 人', () => {
+        const data = {
+            name: '客户A',
+            contactCount: 8,
+            contacts: Array.from({ length: 8 }, (_, i) => ({ realName: `联系人${i}` })),
+        };
+        const output = formatToolResults([ok('clients.get', data)]);
+        expect(output).toContain('联系人4');
+        expect(output).not.toContain('联系人5');
+        expect(output).toContain('共 8 人');
+    });
+
+    it('其余超长数组字段统一裁剪并记录总数', () => {
+        const data = { name: '客户A', orders: Array.from({ length: 30 }, (_, i) => i) };
+        const output = formatToolResults([ok('clients.get', data)]);
+        expect(output).toContain('_ordersTotal');
+        expect(output).toContain('30');
+        expect(output).not.toContain('29');
+    });
+
+    it('裁剪不修改原始数据', () => {
+        const orders = Array.from({ length: 30 }, (_, i) => i);
+        const data = { name: '客户A', orders };
+        formatToolResults([ok('clients.get', data)]);
+        expect(data.orders).toHaveLength(30);
+        expect(data).not.toHaveProperty('_ordersTotal');
+    });
+
+    it('单个结果超过 1500 字符时截断', () => {
+        const data = { text: 'x'.repeat(3000) };
+        const output = formatToolResults([ok('articles.get', data)]);
+        expect(output).toContain('...(已截断)');
+        expect(output.length).toBeLessThan(2000);
+    });
+});
+
+describe('sanitizeOutput', () => {
+    it('无敏感字段时返回原对象（写时复制不重建）', () => {
+        const data = { _id: '1', name: '客户A', rating: 5 };
+        expect(sanitizeOutput(data)).toBe(data);
+    });
+
+    it('无改动的数组也返回原数组', () => {
+        const data = [{ name: 'A' }, { name: 'B' }];
+        expect(sanitizeOutput(data)).toBe(data);
+    });
+
+    it('过滤敏感字段（忽略大小写）', () => {
+        const result = sanitizeOutput({ name: '用户', password: 'x', apiKey: 'y' });
+        expect(result).toEqual({ name: '用户' });
+    });
+
+    it('过滤下划线开头的私有字段但保留 _id', () => {
+        const result = sanitizeOutput({ _id: '1', _internal: 'x', name: 'A' });
+        expect(result).toEqual({ _id: '1', name: 'A' });
+    });
+
+    it('ObjectId 转为字符串', () => {
+        const id = new Types.ObjectId();
+        const result = sanitizeOutput({ _id: id });
+        expect(result._id).toBe(id.toString());
+    });
+
+    it('Date 对象原样保留', () => {
+        const date = new Date();
+        expect(sanitizeOutput({ createTime: date }).createTime).toBe(date);
+    });
+
+    it('嵌套对象中的敏感字段也被过滤', () => {
+        const data = { name: 'A', profile: { password: 'x', email: 'a@b.c' } };
+        const result = sanitizeOutput(data);
+        expect(result.profile).toEqual({ email: 'a@b.c' });
+        expect(result.name).toBe('A');
+    });
+
+    it('不修改输入数据', () => {
+        const data = { name: 'A', password: 'x' };
+        sanitizeOutput(data);
+        expect(data.password).toBe('x');
+    });
+});
@@ -17,7 +17,7 @@ import { generateExplanationText, fromError, createPermissionDeniedError } from
 // 导入拆分的模块
 import { clearMapsCache } from './cache';
 import { checkPermission, logAudit } from './gatekeeper';
-import { callLLM } from './llm';
+import { callLLM, callLLMStream } from './llm';
 import { parseToolCalls, parseUIForm, parsePredictedActions, extractTextContent } from './parsers';
 import { generateSystemPrompt } from './prompt-generator';
 import { executeToolCalls, mergeUISpecs, formatToolResults, ToolExecutionContext } from './tool-executor';
@@ -90,8 +90,10 @@ export async function processAgentRequest(
     const systemPrompt = await generateSystemPrompt(context, contextPack);
 
     // Step 2: 构建消息历史
+    // 历史由前端透传，长度不可控：只取最近 20 条，
+    // 既限制 prompt 体积，也防止恶意超长历史撑爆上下文
     const messages: AgentMessage[] = [
-        ...history,
+        ...history.slice(-20),
         { role: 'user', content: message, timestamp: new Date() },
     ];
 
@@ -159,7 +161,23 @@ export async function processAgentRequest(
     // 追踪最新的 taskList（在循环外声明，确保返回时可用）
     let latestTaskList = currentTaskList;
 
-    if (toolResults.length > 0) {
+    // 所有工具都失败且首轮响应里已有围栏外的文字说明时，
+    // 再让 LLM 格式化一轮只会复述失败——直接用已有文字 + 错误说明返回，
+    // 省掉一整次 LLM 往返
+    const allToolsFailed = toolResults.length > 0
+        && toolResults.every(r => !r.result.success);
+    const priorText = allToolsFailed ? extractTextContent(llmResponse) : '';
+    const skipFormatting = allToolsFailed && !mapStepPrompt && priorText.length > 0;
+
+    if (skipFormatting) {
+        console.log('[Agent] 所有工具执行失败，跳过格式化轮次，直接返回错误说明');
+        const errorLines = toolResults
+            .map(r => `⚠️ ${r.result.error?.message || '工具执行失败'}`)
+            .join('\n');
+        finalResponse = `${priorText}\n\n${errorLines}`;
+    }
+
+    if (toolResults.length > 0 && !skipFormatting) {
         console.log('[Agent] 工具执行完成，请求 LLM 格式化输出...');
 
         const toolResultsText = formatToolResults(toolResults);
@@ -192,10 +210,20 @@ ${toolResultsText}
 请根据以上数据用中文回答用户问题，用 Markdown 表格展示。禁止调用工具。`;
         }
 
+        // 禁止调用工具的格式化轮次可以直接流式输出给前端；
+        // 地图续跑轮次的输出是工具调用 JSON，不适合逐 token 推送
+        const formatWithLLM = (prompt: string, allowStream: boolean): Promise<string> => {
+            const formatMessages: AgentMessage[] = [
+                { role: 'user', content: prompt, timestamp: new Date() },
+            ];
+            if (allowStream && callbacks?.onMessageDelta) {
+                return callLLMStream(systemPrompt, formatMessages, callbacks.onMessageDelta);
+            }
+            return callLLM(systemPrompt, formatMessages);
+        };
+
         try {
-            finalResponse = await callLLM(systemPrompt, [
-                { role: 'user', content: formatPrompt, timestamp: new Date() },
-            ]);
+            finalResponse = await formatWithLLM(formatPrompt, !mapStepPrompt);
             console.log('[Agent] 格式化响应:', finalResponse.substring(0, 300) + '...');
 
             // 循环执行地图步骤
@@ -292,9 +320,7 @@ ${allResultsSummary.substring(0, 3000)}
 请根据以上数据用中文回答用户问题，用 Markdown 表格展示。禁止调用工具。`;
                 }
 
-                finalResponse = await callLLM(systemPrompt, [
-                    { role: 'user', content: nextFormatPrompt, timestamp: new Date() },
-                ]);
+                finalResponse = await formatWithLLM(nextFormatPrompt, !nextMapPrompt || !!isCompleted);
                 console.log('[Agent] 第', round, '轮响应:', finalResponse.substring(0, 200) + '...');
 
                 // 地图完成或不在地图流程中，跳出循环
@@ -6,6 +6,8 @@
 
 import AiMap from '../../models/AiMap';
 import AiTool from '../../models/AiToolkit';
+import { clearToolsPromptCache } from '../tools/registry';
+import { clearToolDocCache } from '../tools/executor';
 
 // ============================================================================
 // 地图缓存
@@ -70,6 +72,7 @@ export async function getAllTools(): Promise<any[]> {
  */
 export function clearToolsCache(): void {
     toolsCache = null;
+    clearToolDocCache();
     console.log('[Agent] 工具缓存已清除');
 }
 
@@ -79,5 +82,7 @@ export function clearToolsCache(): void {
 export function clearAllCaches(): void {
     clearMapsCache();
     clearToolsCache();
+    // 工具 prompt 由工具配置生成，一并失效
+    clearToolsPromptCache();
 }
 
@@ -5,8 +5,8 @@
  */
 
 import { v4 as uuidv4 } from 'uuid';
-import AiTool from '../../models/AiToolkit';
 import { toolRegistry } from '../tools';
+import { getCachedTool } from '../tools/executor';
 import { auditLogService } from '../../services/AuditLogService';
 import { aiPermissionService } from '../../services/AiPermissionService';
 import { createPermissionDeniedError } from './explanation-templates';
@@ -79,8 +79,8 @@ export async function checkPermission(
     userId: string,
     toolId: string
 ): Promise<PermissionCheckResult> {
-    // 1. 检查数据库中是否有这个工具
-    const dbTool = await AiTool.findOne({ toolId, enabled: true });
+    // 1. 检查数据库中是否有这个工具（带缓存，与执行器共享）
+    const dbTool = await getCachedTool(toolId);
     if (!dbTool) {
         // 检查硬编码工具
         const tool = toolRegistry.get(toolId);
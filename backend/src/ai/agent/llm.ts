@@ -4,26 +4,106 @@
  * 负责与大语言模型的通信
  */
 
+import http from 'http';
+import https from 'https';
+import axios, { AxiosInstance } from 'axios';
 import AiModel from '../../models/AiModel';
 import type { AgentMessage } from './types';
 
 /**
- * 调用 LLM
+ * 共享的 HTTP 客户端（长连接复用）
+ *
+ * 一次对话最多 5 轮 LLM 调用，每轮都新建连接会重复付出
+ * TCP + TLS 握手的开销。这里用 keep-alive 连接池让所有轮次
+ * （以及并发会话）复用同一批连接。
  */
-export async function callLLM(
-    systemPrompt: string,
-    messages: AgentMessage[]
-): Promise<string> {
-    const defaultModel = await AiModel.findOne({ isDefault: true, isEnabled: true })
-        .select('+apiKey');
+export const llmHttp: AxiosInstance = axios.create({
+    timeout: 60000,
+    httpAgent: new http.Agent({ keepAlive: true, maxSockets: 64, maxFreeSockets: 32 }),
+    httpsAgent: new https.Agent({ keepAlive: true, maxSockets: 64, maxFreeSockets: 32 }),
+    // 非 2xx 响应不抛异常，由调用方统一处理错误文本
+    validateStatus: () => true,
+});
+
+/**
+ * LLM 并发上限（信号量）
+ *
+ * 推理服务（vLLM/Ollama）靠 continuous batching 吃满吞吐，
+ * 但超过其并行度的请求只会在对端排队并占着连接。这里在应用侧
+ * 限制在途请求数，多出的调用在本地排队，让推理侧批处理管线
+ * 保持满载而不过载。通过 LLM_MAX_CONCURRENCY 环境变量调整。
+ */
+const MAX_CONCURRENT_LLM_CALLS = Number(process.env.LLM_MAX_CONCURRENCY) || 4;
+
+let activeLLMCalls = 0;
+const llmWaitQueue: Array<() => void> = [];
+
+async function acquireLLMSlot(): Promise<void> {
+    if (activeLLMCalls < MAX_CONCURRENT_LLM_CALLS) {
+        activeLLMCalls++;
+        return;
+    }
+    // 排队等待：释放方会把槽位直接移交（计数保持不变），这里无需再自增
+    await new Promise<void>(resolve => llmWaitQueue.push(resolve));
+}
+
+function releaseLLMSlot(): void {
+    // 有等待者时把槽位直接移交给队首，计数不减：
+    // 若先减后唤醒，计数会在唤醒前出现空档，新来的 acquire 能趁机
+    // 插队拿走槽位，既突破并发上限又破坏 FIFO 顺序
+    const next = llmWaitQueue.shift();
+    if (next) {
+        next();
+        return;
+    }
+    activeLLMCalls--;
+}
+
+// 默认模型缓存：模型配置以人的节奏变化，没必要每轮 LLM 调用都查一次库
+let defaultModelCache: { model: any; timestamp: number } | null = null;
+const MODEL_CACHE_TTL = 60 * 1000; // 60 秒
+
+/**
+ * 清除默认模型缓存（AI 设置变更后调用，立即生效）
+ */
+export function clearModelCache(): void {
+    defaultModelCache = null;
+}
+
+/**
+ * 获取默认模型并组装请求地址
+ */
+async function resolveLLMTarget() {
+    let defaultModel: any;
+    if (defaultModelCache && Date.now() - defaultModelCache.timestamp < MODEL_CACHE_TTL) {
+        defaultModel = defaultModelCache.model;
+    } else {
+        defaultModel = await AiModel.findOne({ isDefault: true, isEnabled: true })
+            .select('+apiKey');
+        if (defaultModel) {
+            defaultModelCache = { model: defaultModel, timestamp: Date.now() };
+        }
+    }
 
     if (!defaultModel) {
         throw new Error('未配置默认 AI 模型，请先在「系统设置 > AI 设置」中添加并设为默认');
     }
 
-    console.log('[Agent] 使用模型:', defaultModel.provider, defaultModel.model);
+    let apiUrl = defaultModel.baseUrl || '';
+    apiUrl = apiUrl.replace(/\/+$/, '');
+    if (!apiUrl.endsWith('/v1')) {
+        apiUrl = `${apiUrl}/v1`;
+    }
+    apiUrl = `${apiUrl}/chat/completions`;
+
+    return { defaultModel, apiUrl };
+}
 
-    const openaiMessages = [
+/**
+ * 把 Agent 消息转换为 OpenAI 格式
+ */
+function toOpenAIMessages(systemPrompt: string, messages: AgentMessage[]) {
+    return [
         { role: 'system', content: systemPrompt },
         ...messages.map(m => ({
             role: m.role === 'tool' ? 'assistant' : m.role,
@@ -32,45 +112,168 @@ export async function callLLM(
                 : m.content,
         })),
     ];
+}
 
-    let apiUrl = defaultModel.baseUrl || '';
-    apiUrl = apiUrl.replace(/\/+$/, '');
-    if (!apiUrl.endsWith('/v1')) {
-        apiUrl = `${apiUrl}/v1`;
+/**
+ * 预热 LLM 连接
+ *
+ * 启动时对 /v1/models 发一次轻量请求，把默认模型配置装入缓存、
+ * 并让 keep-alive 连接池先完成 TCP/TLS 握手，首个用户请求
+ * 不再付冷启动的往返开销。失败静默忽略（LLM 未配置/未启动不影响主服务）。
+ */
+export async function prewarmLLM(): Promise<void> {
+    try {
+        const { apiUrl } = await resolveLLMTarget();
+        const modelsUrl = apiUrl.replace(/\/chat\/completions$/, '/models');
+        await llmHttp.get(modelsUrl, { timeout: 5000 });
+        console.log('[Agent] LLM 连接预热完成');
+    } catch {
+        // 未配置默认模型或 LLM 服务未就绪，首个请求时再建连
     }
-    apiUrl = `${apiUrl}/chat/completions`;
+}
+
+/**
+ * 调用 LLM
+ */
+export async function callLLM(
+    systemPrompt: string,
+    messages: AgentMessage[]
+): Promise<string> {
+    const { defaultModel, apiUrl } = await resolveLLMTarget();
+
+    console.log('[Agent] 使用模型:', defaultModel.provider, defaultModel.model);
+
+    const openaiMessages = toOpenAIMessages(systemPrompt, messages);
 
     console.log('[Agent] LLM 请求 URL:', apiUrl);
 
-    let response: Response;
+    let response;
+    await acquireLLMSlot();
     try {
-        response = await fetch(apiUrl, {
-            method: 'POST',
+        response = await llmHttp.post(apiUrl, {
+            model: defaultModel.model,
+            messages: openaiMessages,
+            temperature: defaultModel.temperature ?? 0.7,
+            max_tokens: defaultModel.maxTokens ?? 2048,
+        }, {
             headers: {
                 'Content-Type': 'application/json',
                 ...(defaultModel.apiKey && { 'Authorization': `Bearer ${defaultModel.apiKey}` }),
             },
-            body: JSON.stringify({
-                model: defaultModel.model,
-                messages: openaiMessages,
-                temperature: defaultModel.temperature ?? 0.7,
-                max_tokens: defaultModel.maxTokens ?? 2048,
-            }),
         });
     } catch (fetchError) {
-        console.error('[Agent] LLM fetch 错误:', fetchError);
+        console.error('[Agent] LLM 请求错误:', fetchError);
         throw fetchError;
+    } finally {
+        releaseLLMSlot();
     }
 
-    if (!response.ok) {
-        const errorText = await response.text();
+    if (response.status < 200 || response.status >= 300) {
+        const errorText = typeof response.data === 'string'
+            ? response.data
+            : JSON.stringify(response.data);
         console.error('[Agent] LLM API 响应错误:', response.status, errorText);
         throw new Error(`LLM API 错误: ${response.status} - ${errorText}`);
     }
 
-    const data = await response.json() as { choices?: Array<{ message?: { content?: string } }> };
+    const data = response.data as { choices?: Array<{ message?: { content?: string } }> };
     const content = data.choices?.[0]?.message?.content || '';
     console.log('[Agent] LLM 响应长度:', content.length);
     return content;
 }
 
+/**
+ * 流式调用 LLM
+ *
+ * 以 stream 模式请求 /chat/completions，SSE 增量一到达就通过
+ * onDelta 回调转发出去，同时累积完整文本作为返回值。
+ * 用于"禁止调用工具"的回答格式化轮次：用户首 token 延迟从
+ * 整段生成时间降为首 token 生成时间。
+ */
+export async function callLLMStream(
+    systemPrompt: string,
+    messages: AgentMessage[],
+    onDelta: (delta: string) => void
+): Promise<string> {
+    const { defaultModel, apiUrl } = await resolveLLMTarget();
+
+    const openaiMessages = toOpenAIMessages(systemPrompt, messages);
+
+    // 流式请求在生成结束前一直占用推理侧并行度，持有槽位直到流结束
+    await acquireLLMSlot();
+    try {
+        const response = await llmHttp.post(apiUrl, {
+            model: defaultModel.model,
+            messages: openaiMessages,
+            temperature: defaultModel.temperature ?? 0.7,
+            max_tokens: defaultModel.maxTokens ?? 2048,
+            stream: true,
+        }, {
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+                ...(defaultModel.apiKey && { 'Authorization': `Bearer ${defaultModel.apiKey}` }),
+            },
+            responseType: 'stream',
+        });
+
+        if (response.status < 200 || response.status >= 300) {
+            // 流模式下错误正文也在流里：读出来放进错误信息（与 callLLM 一致），
+            // 同时确保流被消费完/销毁，不让 keep-alive 连接吊在池里
+            const errorStream = response.data as NodeJS.ReadableStream & { destroy?: () => void };
+            let errorText = '';
+            try {
+                for await (const chunk of errorStream) {
+                    errorText += chunk.toString();
+                    if (errorText.length > 4096) {
+                        errorStream.destroy?.();
+                        break;
+                    }
+                }
+            } catch {
+                errorStream.destroy?.();
+            }
+            console.error('[Agent] LLM API 响应错误:', response.status, errorText);
+            throw new Error(`LLM API 错误: ${response.status} - ${errorText}`);
+        }
+
+        const stream = response.data as NodeJS.ReadableStream;
+        let content = '';
+        let buffer = '';
+
+        for await (const chunk of stream) {
+            buffer += chunk.toString();
+
+            // SSE 事件以空行分隔，按行切分并保留未完成的尾部
+            const lines = buffer.split('\n');
+            buffer = lines.pop() || '';
+
+            for (const line of lines) {
+                const trimmed = line.trim();
+                if (!trimmed.startsWith('data:')) continue;
+
+                const payload = trimmed.slice(5).trim();
+                if (payload === '[DONE]') continue;
+
+                try {
+                    const parsed = JSON.parse(payload) as {
+                        choices?: Array<{ delta?: { content?: string } }>;
+                    };
+                    const delta = parsed.choices?.[0]?.delta?.content;
+                    if (delta) {
+                        content += delta;
+                        onDelta(delta);
+                    }
+                } catch {
+                    // 忽略无法解析的心跳/注释行
+                }
+            }
+        }
+
+        console.log('[Agent] LLM 流式响应长度:', content.length);
+        return content;
+    } finally {
+        releaseLLMSlot();
+    }
+}
+
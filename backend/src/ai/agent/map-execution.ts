@@ -6,7 +6,7 @@
 
 import type { ToolResult } from '../tools/types';
 import type { TaskList } from './types';
-import type { IAiMapStep } from '../../models/AiMap';
+import AiMap, { IAiMapStep } from '../../models/AiMap';
 import {
     createTaskListFromMap,
     startTaskList,
@@ -30,20 +30,38 @@ interface MapExecutionContext {
 }
 
 // 会话级的地图执行上下文缓存
+// 利用 Map 的插入序做 LRU：命中时重新插入挪到末尾，超限淘汰最旧的会话，
+// 防止随机/一次性 sessionId 让内存无限增长
 const mapExecutionContexts = new Map<string, MapExecutionContext>();
+const MAX_MAP_CONTEXTS = 500;
 
 /**
  * 获取或创建地图执行上下文
  */
 export function getMapExecutionContext(sessionId: string): MapExecutionContext {
-    if (!mapExecutionContexts.has(sessionId)) {
-        mapExecutionContexts.set(sessionId, {
-            taskList: null,
-            steps: [],
-            stepOutputs: {},
-        });
+    const existing = mapExecutionContexts.get(sessionId);
+    if (existing) {
+        // 挪到末尾，标记为最近使用
+        mapExecutionContexts.delete(sessionId);
+        mapExecutionContexts.set(sessionId, existing);
+        return existing;
     }
-    return mapExecutionContexts.get(sessionId)!;
+
+    const ctx: MapExecutionContext = {
+        taskList: null,
+        steps: [],
+        stepOutputs: {},
+    };
+    mapExecutionContexts.set(sessionId, ctx);
+
+    if (mapExecutionContexts.size > MAX_MAP_CONTEXTS) {
+        const oldest = mapExecutionContexts.keys().next().value;
+        if (oldest !== undefined) {
+            mapExecutionContexts.delete(oldest);
+        }
+    }
+
+    return ctx;
 }
 
 /**
@@ -166,10 +184,6 @@ export async function generateMapStepPrompt(
 ): Promise<MapStepPromptResult> {
     const ctx = getMapExecutionContext(sessionId);
 
-    // 引入 AiMap 模型
-    const { default: mongoose } = await import('mongoose');
-    const AiMap = mongoose.models.AiMap || (await import('../../models/AiMap')).default;
-
     // 用于保存最终的 prompt 和 taskList
     let finalPrompt: string | null = null;
     let finalTaskList: TaskList | null = null;
@@ -8,15 +8,25 @@ import { v4 as uuidv4 } from 'uuid';
 import type { ToolCallRequest } from '../tools/types';
 import type { UISpec, PredictedAction } from './types';
 
+// 预编译的解析正则（每轮 LLM 响应都会过一遍，避免重复构造）
+const TOOL_CALL_RE = /```tool_call\s*([\s\S]*?)```/g;
+const UI_FORM_RE = /```ui_form\s*([\s\S]*?)```/;
+const PREDICTED_ACTIONS_RE = /```predicted_actions\s*([\s\S]*?)```/;
+// extractTextContent 需要剔除的代码块类型
+const STRIPPED_BLOCK_TYPES = ['tool_call', 'predicted_actions', 'ui_form'];
+
 /**
  * 解析 LLM 响应中的工具调用
  */
 export function parseToolCalls(content: string): ToolCallRequest[] {
+    // 最终回答轮通常不含工具调用，先做廉价的子串判断，省掉整段正则扫描
+    if (!content.includes('```tool_call')) {
+        return [];
+    }
+
     const toolCalls: ToolCallRequest[] = [];
-    const regex = /```tool_call\s*([\s\S]*?)```/g;
 
-    let match;
-    while ((match = regex.exec(content)) !== null) {
+    for (const match of content.matchAll(TOOL_CALL_RE)) {
         try {
             const parsed = JSON.parse(match[1].trim());
             if (parsed.toolId) {
@@ -38,8 +48,10 @@ export function parseToolCalls(content: string): ToolCallRequest[] {
  * 解析 LLM 响应中的 UI 表单指令
  */
 export function parseUIForm(content: string): UISpec | null {
-    const regex = /```ui_form\s*([\s\S]*?)```/g;
-    const match = regex.exec(content);
+    // 大多数响应不含表单指令，先做子串判断避免正则扫描
+    if (!content.includes('```ui_form')) return null;
+
+    const match = UI_FORM_RE.exec(content);
 
     if (!match) return null;
 
@@ -64,8 +76,10 @@ export function parseUIForm(content: string): UISpec | null {
  * 解析预判指令
  */
 export function parsePredictedActions(content: string): PredictedAction[] {
-    const regex = /```predicted_actions\s*([\s\S]*?)```/g;
-    const match = regex.exec(content);
+    // 同 parseToolCalls：先做廉价的子串判断
+    if (!content.includes('```predicted_actions')) return [];
+
+    const match = PREDICTED_ACTIONS_RE.exec(content);
 
     if (!match) return [];
 
@@ -88,12 +102,44 @@ export function parsePredictedActions(content: string): PredictedAction[] {
 
 /**
  * 提取纯文本内容（移除所有特殊代码块）
+ *
+ * 单次线性扫描代替多轮正则 replace：每轮 LLM 响应只遍历一遍，
+ * 保留的片段收集后一次性 join，不产生中间字符串
  */
 export function extractTextContent(content: string): string {
-    return content
-        .replace(/```tool_call\s*[\s\S]*?```/g, '')
-        .replace(/```predicted_actions\s*[\s\S]*?```/g, '')
-        .replace(/```ui_form\s*[\s\S]*?```/g, '')
-        .trim();
+    if (!content.includes('```')) {
+        return content.trim();
+    }
+
+    const kept: string[] = [];
+    let i = 0;
+
+    while (i < content.length) {
+        const fenceStart = content.indexOf('```', i);
+        if (fenceStart < 0) {
+            kept.push(content.slice(i));
+            break;
+        }
+
+        const afterFence = fenceStart + 3;
+        const blockType = STRIPPED_BLOCK_TYPES.find(t => content.startsWith(t, afterFence));
+
+        if (!blockType) {
+            // 普通代码块，原样保留
+            kept.push(content.slice(i, afterFence));
+            i = afterFence;
+            continue;
+        }
+
+        kept.push(content.slice(i, fenceStart));
+        const fenceEnd = content.indexOf('```', afterFence + blockType.length);
+        if (fenceEnd < 0) {
+            // 代码块未闭合，剩余内容全部丢弃
+            break;
+        }
+        i = fenceEnd + 3;
+    }
+
+    return kept.join('').trim();
 }
 
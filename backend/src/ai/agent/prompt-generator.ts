@@ -5,6 +5,7 @@
  */
 
 import { contextBootstrapService, ContextPack } from '../../services/ContextBootstrapService';
+import { generateAllToolsPrompt } from '../tools/registry';
 import type { PageContext } from './types';
 
 /**
@@ -25,18 +26,21 @@ function getModuleName(module: string): string {
 
 /**
  * 生成系统提示词 - V4 架构
- * 
+ *
  * 核心原则：
  * 1. 简单查询 → 直接调用 crm.* 或 db.query
  * 2. 复杂任务 → 先用 map.search 找地图
  * 3. AI 绝不编造数据，所有数据必须来自工具返回
+ *
+ * 结构上静态内容（工作原则、工具列表）在前，随请求变化的内容
+ * （用户上下文、当前模块）放在末尾，让推理侧的前缀缓存在
+ * 多轮/多请求间尽量命中
  */
 export async function generateSystemPrompt(
     context?: PageContext,
     contextPack?: ContextPack
 ): Promise<string> {
-    // 动态加载所有工具描述
-    const { generateAllToolsPrompt } = await import('../tools/registry');
+    // 加载所有工具描述
     const toolsPrompt = await generateAllToolsPrompt();
 
     // 获取当前模块提示
@@ -51,10 +55,6 @@ export async function generateSystemPrompt(
 
     return `你是 DHS Atlas 系统的 AI 助手。
 
-${userContextSection ? `## 用户上下文\n${userContextSection}\n` : ''}
-## 当前场景
-${moduleHint}
-
 ## 工作原则（必须遵守）
 
 ### 1. 任务分类
@@ -101,6 +101,10 @@ ${toolsPrompt}
 - 使用 Markdown 表格格式化数据
 - 如果工具返回空，诚实告诉用户"未找到相关数据"
 - 简洁自然，像同事聊天
+
+${userContextSection ? `## 用户上下文\n${userContextSection}\n` : ''}
+## 当前场景
+${moduleHint}
 `;
 }
 
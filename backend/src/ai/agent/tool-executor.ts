@@ -17,95 +17,108 @@ export interface ToolExecutionContext extends ToolContext {
 }
 
 /**
- * 执行工具调用（带守门层）
+ * 执行单个工具调用（带守门层）
+ *
+ * 返回 null 表示该调用被跳过（需要用户确认）
  */
-export async function executeToolCalls(
-    toolCalls: ToolCallRequest[],
+async function executeSingleToolCall(
+    call: ToolCallRequest,
     context: ToolExecutionContext
-): Promise<Array<{ toolId: string; result: ToolResult }>> {
-    const results: Array<{ toolId: string; result: ToolResult }> = [];
-
-    for (const call of toolCalls) {
-        const requestId = call.requestId || uuidv4();
-        const startTime = Date.now();
-
-        // 1. 权限检查
-        const permCheck = await checkPermission(context.userId, call.toolId);
-        if (!permCheck.allowed) {
-            console.log('[Agent] 权限拒绝:', call.toolId, permCheck.reason);
-            const permError = createPermissionDeniedError(permCheck.reason || '权限不足');
-            results.push({
-                toolId: call.toolId,
-                result: {
-                    success: false,
-                    error: permError,
-                },
-            });
-
-            // 记录审计日志
-            await logAudit({
-                userId: context.userId,
-                toolId: call.toolId,
-                params: call.params,
-                result: null,
-                success: false,
-                timestamp: new Date(),
-                sessionId: context.sessionId,
-                errorMessage: permCheck.reason,
-                reasonCode: permCheck.reasonCode,
-                duration: Date.now() - startTime,
-                requestId,
-                module: context.module,
-                pathname: context.pathname,
-            });
-
-            continue;
-        }
-
-        // 2. 检查是否需要确认
-        const tool = toolRegistry.get(call.toolId);
-        if (tool?.requiresConfirmation) {
-            console.log('[Agent] 工具需要确认:', call.toolId);
-            continue; // 跳过需要确认的工具
-        }
-
-        // 3. 执行工具
-        const result = await toolRegistry.execute(
-            call.toolId,
-            call.params,
-            { ...context, requestId }
-        );
-
-        const duration = Date.now() - startTime;
-        console.log('[Agent] 工具执行完成:', call.toolId, `${duration}ms`);
-
-        // 提取集合和操作信息（用于审计）
-        const collection = call.params?.collection as string | undefined;
-        const operation = call.params?.operation as string | undefined;
-
-        // 4. 记录审计日志
-        await logAudit({
+): Promise<{ toolId: string; result: ToolResult } | null> {
+    const requestId = call.requestId || uuidv4();
+    const startTime = Date.now();
+
+    // 1. 权限检查
+    const permCheck = await checkPermission(context.userId, call.toolId);
+    if (!permCheck.allowed) {
+        console.log('[Agent] 权限拒绝:', call.toolId, permCheck.reason);
+        const permError = createPermissionDeniedError(permCheck.reason || '权限不足');
+
+        // 记录审计日志（只入队不落库，无需等待）
+        void logAudit({
             userId: context.userId,
             toolId: call.toolId,
             params: call.params,
-            result: result.success ? result.data : null,
-            success: result.success,
+            result: null,
+            success: false,
             timestamp: new Date(),
             sessionId: context.sessionId,
-            errorMessage: result.error?.message,
-            reasonCode: result.error?.code,
-            duration,
+            errorMessage: permCheck.reason,
+            reasonCode: permCheck.reasonCode,
+            duration: Date.now() - startTime,
             requestId,
-            collection,
-            operation,
             module: context.module,
             pathname: context.pathname,
         });
 
-        results.push({ toolId: call.toolId, result });
+        return {
+            toolId: call.toolId,
+            result: {
+                success: false,
+                error: permError,
+            },
+        };
     }
 
-    return results;
+    // 2. 检查是否需要确认
+    const tool = toolRegistry.get(call.toolId);
+    if (tool?.requiresConfirmation) {
+        console.log('[Agent] 工具需要确认:', call.toolId);
+        return null; // 跳过需要确认的工具
+    }
+
+    // 3. 执行工具
+    const result = await toolRegistry.execute(
+        call.toolId,
+        call.params,
+        { ...context, requestId }
+    );
+
+    const duration = Date.now() - startTime;
+    console.log('[Agent] 工具执行完成:', call.toolId, `${duration}ms`);
+
+    // 提取集合和操作信息（用于审计）
+    const collection = call.params?.collection as string | undefined;
+    const operation = call.params?.operation as string | undefined;
+
+    // 4. 记录审计日志（只入队不落库，无需等待）
+    void logAudit({
+        userId: context.userId,
+        toolId: call.toolId,
+        params: call.params,
+        result: result.success ? result.data : null,
+        success: result.success,
+        timestamp: new Date(),
+        sessionId: context.sessionId,
+        errorMessage: result.error?.message,
+        reasonCode: result.error?.code,
+        duration,
+        requestId,
+        collection,
+        operation,
+        module: context.module,
+        pathname: context.pathname,
+    });
+
+    return { toolId: call.toolId, result };
+}
+
+/**
+ * 执行工具调用（带守门层）
+ *
+ * 同一轮里的多个工具调用彼此独立（都是查询型 I/O），并发执行
+ * 让总耗时从各工具耗时之和降到最慢一个的耗时。结果顺序与
+ * 调用顺序保持一致。
+ */
+export async function executeToolCalls(
+    toolCalls: ToolCallRequest[],
+    context: ToolExecutionContext
+): Promise<Array<{ toolId: string; result: ToolResult }>> {
+    const settled = await Promise.all(
+        toolCalls.map(call => executeSingleToolCall(call, context))
+    );
+
+    return settled.filter((r): r is { toolId: string; result: ToolResult } => r !== null);
 }
 
 /**
@@ -129,6 +142,9 @@ export function mergeUISpecs(
 
 /**
  * 格式化工具结果为文本
+ *
+ * 序列化用紧凑格式：结果只喂给 LLM，不需要缩进排版，
+ * 大文档少一倍以上的字符也省下相应的 prompt token
  */
 export function formatToolResults(
     toolResults: Array<{ toolId: string; result: ToolResult }>
@@ -137,9 +153,12 @@ export function formatToolResults(
         if (!r.result.success) {
             return `[${r.toolId} 错误]: ${r.result.error?.message}`;
         }
-        // 截断数组数据，最多保留 5 条
+        // 先在原始数据上裁剪，再序列化：否则几十 MB 的查询结果会先完整
+        // stringify 成字符串，然后才被截断到 1500 字符，白付序列化开销
         let data: any = r.result.data;
-        if (data && typeof data === 'object') {
+        if (Array.isArray(data) && data.length > 20) {
+            data = [...data.slice(0, 20), `...(共 ${data.length} 条，仅显示前 20 条)`];
+        } else if (data && typeof data === 'object') {
             const d = data as any;
             // 处理 contacts 数组
             if (d.contacts && Array.isArray(d.contacts) && d.contacts.length > 5) {
@@ -149,8 +168,16 @@ export function formatToolResults(
             if (d.projects && Array.isArray(d.projects) && d.projects.length > 5) {
                 data = { ...d, projects: d.projects.slice(0, 5), _note: `共 ${d.projectCount} 个，仅显示前 5 个` };
             }
+            // 其余超长数组字段统一裁剪
+            for (const [key, value] of Object.entries(data as Record<string, any>)) {
+                if (Array.isArray(value) && value.length > 20) {
+                    if (data === d) data = { ...d };
+                    data[key] = value.slice(0, 20);
+                    data[`_${key}Total`] = value.length;
+                }
+            }
         }
-        const jsonStr = JSON.stringify(data, null, 2);
+        const jsonStr = JSON.stringify(data);
         // 单个结果最多 1500 字符
         const truncated = jsonStr.length > 1500 ? jsonStr.substring(0, 1500) + '...(已截断)' : jsonStr;
         return `[${r.toolId} 执行结果]:\n${truncated}`;
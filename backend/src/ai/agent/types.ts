@@ -165,6 +165,8 @@ export enum SSEEventType {
     TOOL_RESULT = 'tool_result',
     /** AI 消息（流式文本） */
     AI_MESSAGE = 'ai_message',
+    /** AI 消息增量（逐 token 推送） */
+    AI_MESSAGE_DELTA = 'ai_message_delta',
     /** 任务完成 */
     TASK_COMPLETE = 'task_complete',
     /** 错误 */
@@ -213,6 +215,8 @@ export interface ProgressCallback {
     onToolResult?: (toolId: string, result: ToolResult) => void;
     /** AI 消息（流式文本） */
     onMessage?: (content: string) => void;
+    /** AI 消息增量（LLM 流式输出时逐 token 触发） */
+    onMessageDelta?: (delta: string) => void;
     /** 任务完成 */
     onTaskComplete?: (taskList: TaskList, finalContent: string) => void;
     /** 错误 */
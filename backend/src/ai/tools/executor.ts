@@ -14,6 +14,9 @@
 
 import mongoose from 'mongoose';
 import AiTool, { IToolExecution, IExecutionStep } from '../../models/AiToolkit';
+import AiMap from '../../models/AiMap';
+import Client from '../../models/Client';
+import { dataMapService } from '../../services/DataMapService';
 import { ToolResult, ToolContext, StructuredError } from './types';
 import {
     createToolNotFoundError,
@@ -25,6 +28,67 @@ import {
     fromError,
 } from '../agent/explanation-templates';
 
+// 调试日志开关：execution 配置的完整 JSON.stringify 在每次工具调用
+// 都执行一遍是可观的纯开销，默认关闭，排查问题时用环境变量打开
+const TOOL_DEBUG = process.env.AI_TOOL_DEBUG === 'true';
+
+// ObjectId 的 24 位十六进制格式。先用正则校验再构造，
+// 非法输入直接保持原值，不走构造函数抛异常的慢路径
+const OID_RE = /^[0-9a-fA-F]{24}$/;
+
+/**
+ * 字符串转 ObjectId（非法格式返回原值）
+ */
+function toObjectId(value: any): any {
+    if (typeof value === 'string' && OID_RE.test(value)) {
+        return new mongoose.Types.ObjectId(value);
+    }
+    return value;
+}
+
+// 需要下探子条件的逻辑操作符（模块级常量，避免每次调用重建数组）
+const LOGICAL_OPS = ['$or', '$and', '$nor'] as const;
+
+/**
+ * 转换查询中的 _id 字段（含 $in 数组，以及 $or/$and 子条件）
+ *
+ * 注意：本库的外键（clientId、quotationId 等）都以字符串存储，
+ * 只有 _id 是真正的 ObjectId，不要扩大转换范围
+ */
+function convertIdFields(query: Record<string, any>): void {
+    if (!query || typeof query !== 'object') return;
+
+    if (query._id) {
+        // 单个字符串 ID
+        query._id = toObjectId(query._id);
+        // $in 操作符中的 ID 数组
+        if (query._id.$in && Array.isArray(query._id.$in)) {
+            query._id.$in = query._id.$in.map(toObjectId);
+        }
+    }
+
+    // Agent 生成的查询基本是扁平的，只需下探 $or/$and 一类的逻辑组合
+    for (const op of LOGICAL_OPS) {
+        const clauses = query[op];
+        if (Array.isArray(clauses)) {
+            for (const clause of clauses) {
+                convertIdFields(clause);
+            }
+        }
+    }
+}
+
+// 未指定 projection 时按集合排除已知的大字段：
+// AI 摘要用不到正文/附件列表，这些字段却占了文档的绝大部分体积。
+// 工具显式传 projection 时以工具配置为准
+const DEFAULT_PROJECTIONS: Record<string, Record<string, 0>> = {
+    clients: { files: 0 },
+    articles: { content: 0 },
+    forms: { content: 0 },
+    contracttemplates: { content: 0 },
+    generatedcontracts: { content: 0 },
+};
+
 // ============================================================================
 // 敏感字段过滤
 // ============================================================================
@@ -34,7 +98,7 @@ import {
  * 这些字段在返回给用户之前会被过滤
  * 注意：比较时会转换为小写
  */
-const SENSITIVE_FIELDS = [
+const SENSITIVE_FIELDS = new Set([
     'password',
     'passwordhash',
     'salt',
@@ -46,12 +110,15 @@ const SENSITIVE_FIELDS = [
     'secret',
     'privatekey',
     '__v',  // Mongoose 版本字段
-];
+]);
 
 /**
  * 递归过滤敏感字段
+ *
+ * 写时复制：大多数结果不含敏感字段，没有任何改动时直接返回原对象，
+ * 避免为每条结果整棵重建对象树
  */
-function sanitizeOutput(data: any, depth: number = 0): any {
+export function sanitizeOutput(data: any, depth: number = 0): any {
     // 防止无限递归
     if (depth > 10) {
         return data;
@@ -62,7 +129,17 @@ function sanitizeOutput(data: any, depth: number = 0): any {
     }
 
     if (Array.isArray(data)) {
-        return data.map(item => sanitizeOutput(item, depth + 1));
+        let sanitized: any[] | null = null;
+        for (let i = 0; i < data.length; i++) {
+            const item = sanitizeOutput(data[i], depth + 1);
+            if (sanitized) {
+                sanitized.push(item);
+            } else if (item !== data[i]) {
+                sanitized = data.slice(0, i);
+                sanitized.push(item);
+            }
+        }
+        return sanitized || data;
     }
 
     if (typeof data === 'object') {
@@ -76,20 +153,27 @@ function sanitizeOutput(data: any, depth: number = 0): any {
             return data.toString();
         }
 
+        let changed = false;
         const sanitized: Record<string, any> = {};
         for (const [key, value] of Object.entries(data)) {
             const lowerKey = key.toLowerCase();
             // 跳过敏感字段（忽略大小写）
-            if (SENSITIVE_FIELDS.includes(lowerKey)) {
+            if (SENSITIVE_FIELDS.has(lowerKey)) {
+                changed = true;
                 continue;
             }
             // 跳过以下划线开头的私有字段（除了 _id）
             if (key.startsWith('_') && key !== '_id') {
+                changed = true;
                 continue;
             }
-            sanitized[key] = sanitizeOutput(value, depth + 1);
+            const sanitizedValue = sanitizeOutput(value, depth + 1);
+            if (sanitizedValue !== value) {
+                changed = true;
+            }
+            sanitized[key] = sanitizedValue;
         }
-        return sanitized;
+        return changed ? sanitized : data;
     }
 
     return data;
@@ -237,15 +321,24 @@ const BLOCKED_COLLECTIONS = new Set([
     'auditlogs',          // 审计日志
 ]);
 
+// 白名单缓存：Mongoose 模型注册后基本不变，
+// 不必每次数据库操作都重建一遍 Set
+let allowedCollectionsCache: { collections: Set<string>; timestamp: number } | null = null;
+const ALLOWED_COLLECTIONS_TTL = 5 * 60 * 1000; // 5 分钟
+
 /**
- * 获取允许访问的集合列表
- * 
+ * 获取允许访问的集合列表（带缓存）
+ *
  * 现在自动从 Mongoose 注册的模型获取，无需手动配置 AiDataModel
  * 基于 AI 原生原则：AI 在已知世界中自由，但有安全边界
  */
 async function getAllowedCollections(): Promise<Set<string>> {
+    if (allowedCollectionsCache
+        && Date.now() - allowedCollectionsCache.timestamp < ALLOWED_COLLECTIONS_TTL) {
+        return allowedCollectionsCache.collections;
+    }
+
     // 确保 DataMapService 已初始化
-    const { dataMapService } = await import('../../services/DataMapService');
     const status = dataMapService.getStatus();
     if (!status.initialized) {
         await dataMapService.refresh();
@@ -267,6 +360,7 @@ async function getAllowedCollections(): Promise<Set<string>> {
         }
     }
 
+    allowedCollectionsCache = { collections: allCollections, timestamp: Date.now() };
     return allCollections;
 }
 
@@ -294,13 +388,43 @@ async function validateCollectionAccess(collection: string): Promise<void> {
 }
 
 /**
- * 清除集合缓存（保留接口兼容性）
- * 
- * 注意：由于集合列表现在从 Mongoose 动态获取，此函数已无实际作用
- * 保留此函数是为了避免旧代码调用报错
+ * 清除集合白名单缓存（注册新模型后调用，立即生效）
  */
 export function clearCollectionCache(): void {
-    console.log('[ToolExecutor] clearCollectionCache 已废弃，集合列表现在自动从 Mongoose 获取');
+    allowedCollectionsCache = null;
+}
+
+// ============================================================================
+// 工具定义缓存
+// ============================================================================
+
+// 单个工具调用会触发多次 AiTool.findOne（权限检查、canExecute、execute），
+// 按 toolId 缓存文档让一次派发只查一次库
+const toolDocCache = new Map<string, { tool: any | null; timestamp: number }>();
+const TOOL_DOC_CACHE_TTL = 5 * 60 * 1000; // 5 分钟
+
+/**
+ * 获取启用的工具定义（带缓存）
+ *
+ * 未找到的 toolId 也会缓存 null，避免 LLM 反复编造不存在的工具时
+ * 每次都打到数据库
+ */
+export async function getCachedTool(toolId: string): Promise<any | null> {
+    const cached = toolDocCache.get(toolId);
+    if (cached && Date.now() - cached.timestamp < TOOL_DOC_CACHE_TTL) {
+        return cached.tool;
+    }
+
+    const tool = await AiTool.findOne({ toolId, enabled: true }).lean();
+    toolDocCache.set(toolId, { tool, timestamp: Date.now() });
+    return tool;
+}
+
+/**
+ * 清除工具定义缓存（工具配置变更后调用）
+ */
+export function clearToolDocCache(): void {
+    toolDocCache.clear();
 }
 
 /**
@@ -505,44 +629,23 @@ async function executeDbOperation(
     const convertFields = (step as any).convertToObjectId as string[] | undefined;
     if (convertFields && Array.isArray(convertFields)) {
         for (const field of convertFields) {
-            if (query[field] && typeof query[field] === 'string' && query[field].length === 24) {
-                try {
-                    query[field] = new mongoose.Types.ObjectId(query[field]);
-                } catch {
-                    // 如果转换失败，保持原值
-                }
+            // 只转换查询中实际存在的字段：无条件赋值会写入 undefined，
+            // 驱动序列化为 null 后"不过滤该字段"就变成了"该字段为空"
+            if (query[field] !== undefined) {
+                query[field] = toObjectId(query[field]);
             }
         }
     }
     // 自动检测 _id 字段并转换为 ObjectId
-    if (query._id) {
-        // 单个字符串 ID
-        if (typeof query._id === 'string' && query._id.length === 24) {
-            try {
-                query._id = new mongoose.Types.ObjectId(query._id);
-            } catch {
-                // 转换失败，保持原值
-            }
-        }
-        // $in 操作符中的 ID 数组
-        if (query._id.$in && Array.isArray(query._id.$in)) {
-            query._id.$in = query._id.$in.map((id: string) => {
-                if (typeof id === 'string' && id.length === 24) {
-                    try {
-                        return new mongoose.Types.ObjectId(id);
-                    } catch {
-                        return id;
-                    }
-                }
-                return id;
-            });
-        }
-    }
+    convertIdFields(query);
     let limit = resolveTemplate(step.limit, context);
     if (typeof limit === 'string') {
         limit = parseInt(limit, 10) || 20;
     }
 
+    // 省略 projection 时使用按集合的默认投影
+    const effectiveProjection = projection || DEFAULT_PROJECTIONS[collection];
+
     // 对于 simple 类型的执行配置，type 字段表示执行模式而非操作类型
     // 所以优先使用 operation 参数，其次才用 step.type
     const stepType = operation || (step as IExecutionStep).type;
@@ -551,9 +654,13 @@ async function executeDbOperation(
         case 'db_query':
         case 'find': {
             let cursor = coll.find(query);
-            if (projection) cursor = cursor.project(projection);
+            if (effectiveProjection) cursor = cursor.project(effectiveProjection);
             if (sort) cursor = cursor.sort(sort);
-            if (limit) cursor = cursor.limit(limit);
+            if (limit) {
+                // 批大小对齐 limit：默认首批 101 条会超出工具实际消费量，
+                // 一个批次取完即止，避免服务器多缓冲一轮
+                cursor = cursor.limit(limit).batchSize(Math.min(limit, 100));
+            }
 
             const results = await cursor.toArray();
 
@@ -566,7 +673,7 @@ async function executeDbOperation(
 
         case 'findOne': {
             const options: any = {};
-            if (projection) options.projection = projection;
+            if (effectiveProjection) options.projection = effectiveProjection;
             return await coll.findOne(query, options);
         }
 
@@ -609,6 +716,10 @@ async function executeDbOperation(
         }
 
         case 'count': {
+            // 空条件的全表计数走集合元数据（O(1)），有条件才真正扫描
+            if (Object.keys(query).length === 0) {
+                return await coll.estimatedDocumentCount();
+            }
             return await coll.countDocuments(query);
         }
 
@@ -791,9 +902,6 @@ const customHandlers: Record<string, (context: ExecutionContext) => Promise<any>
             return { maps: [], message: '请提供搜索关键词' };
         }
 
-        // 动态导入 AiMap 模型
-        const AiMap = (await import('../../models/AiMap')).default;
-
         // 搜索匹配的地图
         const maps = await AiMap.find({
             enabled: true,
@@ -862,8 +970,6 @@ const customHandlers: Record<string, (context: ExecutionContext) => Promise<any>
             return { error: '请提供搜索关键词，如"客户"、"项目"、"报价"等' };
         }
 
-        const { dataMapService } = await import('../../services/DataMapService');
-
         // 确保服务已初始化
         const status = dataMapService.getStatus();
         if (!status.initialized) {
@@ -885,8 +991,6 @@ const customHandlers: Record<string, (context: ExecutionContext) => Promise<any>
             return { error: '请提供集合名称' };
         }
 
-        const { dataMapService } = await import('../../services/DataMapService');
-
         // 确保服务已初始化
         const status = dataMapService.getStatus();
         if (!status.initialized) {
@@ -895,6 +999,43 @@ const customHandlers: Record<string, (context: ExecutionContext) => Promise<any>
 
         return dataMapService.getTableDetail(collection);
     },
+
+    /**
+     * clientsBatchGet - 按名称批量获取客户
+     *
+     * Agent 需要多个客户时，逐个调用查询工具要付出
+     * N 次 LLM→工具→LLM 往返；这里一次 $in 查询全部取回
+     */
+    clientsBatchGet: async (context: ExecutionContext) => {
+        const names = context.params.names as string[];
+        if (!Array.isArray(names) || names.length === 0) {
+            return { error: '请提供客户名称数组，如 ["公司A", "公司B"]' };
+        }
+
+        // 上限防止一次性拉取过多（Agent 正常场景远低于此）
+        const queryNames = names.slice(0, 50);
+        const clients = await Client.find({ name: { $in: queryNames } })
+            .select('-files')
+            .lean();
+
+        const clientByName = new Map(clients.map(c => [c.name, c]));
+        const found: Record<string, any> = {};
+        const missing: string[] = [];
+        for (const name of queryNames) {
+            const client = clientByName.get(name);
+            if (client) {
+                found[name] = client;
+            } else {
+                missing.push(name);
+            }
+        }
+
+        return {
+            clients: found,
+            missing,
+            message: `找到 ${clients.length}/${queryNames.length} 个客户${missing.length > 0 ? `，未找到：${missing.join('、')}` : ''}`,
+        };
+    },
 };
 
 /**
@@ -939,8 +1080,8 @@ export class ToolExecutor {
         toolContext?: ToolContext
     ): Promise<ToolResult> {
         try {
-            // 从数据库获取工具定义
-            const tool = await AiTool.findOne({ toolId, enabled: true });
+            // 从数据库获取工具定义（带缓存）
+            const tool = await getCachedTool(toolId);
             if (!tool) {
                 return {
                     success: false,
@@ -1009,18 +1150,22 @@ export class ToolExecutor {
             let result: any;
 
             // 调试日志 - 完整输出 execution 对象
-            console.log('[ToolExecutor] 工具执行配置:', {
-                toolId,
-                executionFull: JSON.stringify(tool.execution),
-                executionType: tool.execution.type,
-                hasHandler: !!tool.execution.handler,
-                handler: tool.execution.handler,
-            });
+            if (TOOL_DEBUG) {
+                console.log('[ToolExecutor] 工具执行配置:', {
+                    toolId,
+                    executionFull: JSON.stringify(tool.execution),
+                    executionType: tool.execution.type,
+                    hasHandler: !!tool.execution.handler,
+                    handler: tool.execution.handler,
+                });
+            }
 
             // 根据执行类型选择执行方式
             if (tool.execution.type === 'custom' && tool.execution.handler) {
                 // 自定义处理器模式
-                console.log('[ToolExecutor] 使用自定义处理器:', tool.execution.handler);
+                if (TOOL_DEBUG) {
+                    console.log('[ToolExecutor] 使用自定义处理器:', tool.execution.handler);
+                }
                 result = await executeCustomHandler(
                     tool.execution.handler,
                     context
@@ -1085,7 +1230,7 @@ export class ToolExecutor {
      * 检查工具是否存在且可执行
      */
     static async canExecute(toolId: string): Promise<boolean> {
-        const tool = await AiTool.findOne({ toolId, enabled: true });
+        const tool = await getCachedTool(toolId);
         return !!(tool && tool.execution);
     }
 
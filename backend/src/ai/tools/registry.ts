@@ -230,12 +230,38 @@ export function generateToolsPrompt(toolIds?: string[]): string {
     return formatToolsPrompt(descriptions);
 }
 
+// 完整工具 prompt 缓存（系统提示词每次请求都要用到，
+// 没必要每次都查数据库并重新拼接多 KB 文本）
+let toolsPromptCache: { prompt: string; timestamp: number } | null = null;
+const TOOLS_PROMPT_CACHE_TTL = 5 * 60 * 1000; // 5 分钟
+
 /**
  * 生成工具的 system prompt 片段（异步版本，包括配置化工具）
+ *
+ * 不带 toolIds 的调用结果会缓存 5 分钟；工具配置变更后
+ * 调用 clearToolsPromptCache() 立即失效
  */
 export async function generateAllToolsPrompt(toolIds?: string[]): Promise<string> {
+    const cacheable = !toolIds?.length;
+    if (cacheable && toolsPromptCache
+        && Date.now() - toolsPromptCache.timestamp < TOOLS_PROMPT_CACHE_TTL) {
+        return toolsPromptCache.prompt;
+    }
+
     const descriptions = await getAllToolDescriptions(toolIds);
-    return formatToolsPrompt(descriptions);
+    const prompt = formatToolsPrompt(descriptions);
+
+    if (cacheable) {
+        toolsPromptCache = { prompt, timestamp: Date.now() };
+    }
+    return prompt;
+}
+
+/**
+ * 清除工具 prompt 缓存
+ */
+export function clearToolsPromptCache(): void {
+    toolsPromptCache = null;
 }
 
 /**
@@ -257,6 +283,9 @@ function getCategoryName(category: string): string {
 /**
  * 格式化工具描述为 prompt 文本
  * 按类别分组，优先显示 crm 工具
+ *
+ * 片段先收集进数组、最后一次 join：多 KB 的 prompt 用 += 逐段拼接
+ * 会反复复制越来越长的中间字符串
  */
 function formatToolsPrompt(descriptions: ToolDescription[]): string {
     if (descriptions.length === 0) {
@@ -276,25 +305,25 @@ function formatToolsPrompt(descriptions: ToolDescription[]): string {
     // 定义类别显示顺序（crm 优先）
     const categoryOrder = ['crm', 'contract', 'schema', 'database', 'ui', 'system', 'general'];
 
-    let result = '';
+    const parts: string[] = [];
 
     for (const category of categoryOrder) {
         const tools = grouped.get(category);
         if (!tools || tools.length === 0) continue;
 
-        result += `### ${getCategoryName(category)}\n\n`;
+        parts.push(`### ${getCategoryName(category)}\n\n`);
 
         for (const tool of tools) {
             const confirmText = tool.requiresConfirmation ? ' ⚠️需确认' : '';
-            result += `**${tool.id}** - ${tool.name}${confirmText}\n`;
-            result += `${tool.description}\n`;
+            parts.push(`**${tool.id}** - ${tool.name}${confirmText}\n`);
+            parts.push(`${tool.description}\n`);
             if (tool.examples) {
-                result += `${tool.examples}\n`;
+                parts.push(`${tool.examples}\n`);
             }
-            result += '\n';
+            parts.push('\n');
         }
     }
 
-    return result.trim();
+    return parts.join('').trim();
 }
 
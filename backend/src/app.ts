@@ -9,6 +9,7 @@ import { createServer } from 'http';
 import { WebSocketService } from './services/WebSocketService';
 import { TaskSchedulerService } from './services/TaskSchedulerService';
 import { dataMapService } from './services/DataMapService';
+import { prewarmLLM } from './ai/agent/llm';
 
 // 导入路由
 import userRoutes from './routes/users';
@@ -77,7 +78,14 @@ let taskSchedulerService: TaskSchedulerService;
 const connectDB = async () => {
   try {
     const mongoUri = process.env.MONGODB_URI || 'mongodb://localhost:27017/donhauser';
-    await mongoose.connect(mongoUri);
+    // 连接池调优：Agent 工具调用和 SSE 并发时默认池容易打满，
+    // 预留最小连接数避免突发流量时的建连延迟；
+    // 缩短选主超时，数据库不可达时尽快暴露而不是挂起 30 秒
+    await mongoose.connect(mongoUri, {
+      maxPoolSize: Number(process.env.MONGO_MAX_POOL_SIZE) || 50,
+      minPoolSize: Number(process.env.MONGO_MIN_POOL_SIZE) || 5,
+      serverSelectionTimeoutMS: 5000,
+    });
     console.log('✅ MongoDB数据库连接成功');
     console.log(`🔗 连接地址: ${mongoUri}`);
   } catch (error) {
@@ -97,6 +105,9 @@ connectDB().then(() => {
 
   // 启动数据地图服务（AI 使用，每小时自动刷新）
   dataMapService.start();
+
+  // 预热 LLM 连接（失败不影响启动）
+  prewarmLLM();
 });
 
 // 中间件
@@ -104,7 +115,9 @@ app.use(helmet({
   crossOriginResourcePolicy: { policy: "cross-origin" }
 }));
 app.use(cors());
-app.use(morgan('combined'));
+// 生产环境用精简日志格式：combined 每个请求要拼接十几个字段，
+// 在高频的 SSE/工具调用流量下是可观的纯开销
+app.use(morgan(process.env.NODE_ENV === 'production' ? 'short' : 'combined'));
 app.use(express.json({ limit: '50mb' }));
 app.use(express.urlencoded({ extended: true, limit: '50mb' }));
 
@@ -120,9 +133,9 @@ app.use('/uploads', express.static(path.join(__dirname, '../uploads'), {
 }));
 
 // 基础路由
-app.get('/', (req, res) => {
-  res.json({
-    message: '设计业务管理系统 API',
+// 根路由内容不随请求变化，启动时构建一次
+const API_INFO = {
+  message: '设计业务管理系统 API',
     version: '1.0.0',
     status: 'running',
     endpoints: {
@@ -154,17 +167,27 @@ app.get('/', (req, res) => {
       formCategories: '/api/form-categories',
       forms: '/api/forms'
     }
-  });
-});
+};
 
-// 健康检查
-app.get('/health', (req, res) => {
-  res.json({ status: 'ok', timestamp: new Date().toISOString() });
+app.get('/', (req, res) => {
+  res.json(API_INFO);
 });
 
-app.get('/api/health', (req, res) => {
-  res.json({ status: 'ok', timestamp: new Date().toISOString() });
-});
+// 健康检查：前端轮询频繁，序列化结果缓存 1 秒复用
+let healthJsonCache: { json: string; timestamp: number } | null = null;
+
+const healthCheck = (req: express.Request, res: express.Response) => {
+  if (!healthJsonCache || Date.now() - healthJsonCache.timestamp >= 1000) {
+    healthJsonCache = {
+      json: JSON.stringify({ status: 'ok', timestamp: new Date().toISOString() }),
+      timestamp: Date.now(),
+    };
+  }
+  res.type('application/json').send(healthJsonCache.json);
+};
+
+app.get('/health', healthCheck);
+app.get('/api/health', healthCheck);
 
 // API 路由
 app.use('/api/auth', authRoutes);
@@ -19,26 +19,77 @@ import type { ToolResult } from '../ai/tools/types';
  * 否则数据可能被缓冲，导致"假聊天"问题
  */
 function sendSSE(res: Response, event: SSEEventType, data: unknown): void {
-    const message = `event: ${event}\ndata: ${JSON.stringify(data)}\n\n`;
-    res.write(message);
-    
-    // 尝试多种方式强制刷新缓冲区
-    // 方式 1: compression 中间件的 flush
+    writeSSE(res, event, JSON.stringify(data));
+}
+
+// 同一个 taskList 对象会随 task_start/step_start/step_complete 等多个事件
+// 重复下发；task-manager 的更新是不可变的（每次返回新对象），
+// 所以可以按对象身份缓存序列化结果，整个任务只为每个版本序列化一次
+const taskListJsonCache = new WeakMap<TaskList, string>();
+
+function serializeTaskList(taskList: TaskList): string {
+    let json = taskListJsonCache.get(taskList);
+    if (!json) {
+        json = JSON.stringify(taskList);
+        taskListJsonCache.set(taskList, json);
+    }
+    return json;
+}
+
+/**
+ * 发送带 taskList 的 SSE 事件（复用缓存的 taskList JSON）
+ */
+function sendTaskListSSE(
+    res: Response,
+    event: SSEEventType,
+    taskList: TaskList,
+    extra: Record<string, unknown>
+): void {
+    const extraJson = JSON.stringify(extra);
+    writeSSE(res, event, `{"taskList":${serializeTaskList(taskList)},${extraJson.slice(1)}`);
+}
+
+// 每个响应的待发送缓冲：同一个事件循环 tick 内产生的事件
+// （如一轮多个工具的 tool_result、逐 token 的 delta 突发）合并成
+// 一次 write，减少系统调用和 TCP 小包数量。SSE 规范允许一个 chunk
+// 携带多个事件，浏览器会逐个分发，首事件延迟只有一个 setImmediate
+interface SSEBuffer {
+    parts: string[];
+    scheduled: boolean;
+}
+
+const sseBuffers = new WeakMap<Response, SSEBuffer>();
+
+function writeSSE(res: Response, event: SSEEventType, dataJson: string): void {
+    let buf = sseBuffers.get(res);
+    if (!buf) {
+        buf = { parts: [], scheduled: false };
+        sseBuffers.set(res, buf);
+    }
+
+    buf.parts.push(`event: ${event}\ndata: ${dataJson}\n\n`);
+
+    if (!buf.scheduled) {
+        buf.scheduled = true;
+        setImmediate(() => flushSSE(res));
+    }
+}
+
+function flushSSE(res: Response): void {
+    const buf = sseBuffers.get(res);
+    if (!buf) return;
+    buf.scheduled = false;
+
+    if (buf.parts.length === 0 || res.writableEnded) return;
+
+    const payload = buf.parts.join('');
+    buf.parts.length = 0;
+    res.write(payload);
+
+    // compression 中间件存在时需要显式 flush
     if (typeof (res as any).flush === 'function') {
         (res as any).flush();
     }
-    
-    // 方式 2: 使用 socket 的 uncork (强制发送缓冲数据)
-    if (res.socket) {
-        res.socket.uncork();
-        res.socket.cork(); // 重新启用缓冲，但之前的数据已发送
-        // 使用 setImmediate 在下一个事件循环再次 uncork
-        setImmediate(() => {
-            if (res.socket) {
-                res.socket.uncork();
-            }
-        });
-    }
 }
 
 /**
@@ -91,8 +142,7 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
     const callbacks: ProgressCallback = {
         onTaskStart: (taskList: TaskList) => {
             console.log('[SSE] 任务开始:', taskList.mapName);
-            sendSSE(res, 'task_start' as SSEEventType, {
-                taskList,
+            sendTaskListSSE(res, 'task_start' as SSEEventType, taskList, {
                 timestamp: new Date().toISOString(),
             });
         },
@@ -100,8 +150,7 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
         onStepStart: (taskList: TaskList, stepNumber: number) => {
             const step = taskList.tasks.find(t => t.stepNumber === stepNumber);
             console.log('[SSE] 步骤开始:', stepNumber, step?.name);
-            sendSSE(res, 'step_start' as SSEEventType, {
-                taskList,
+            sendTaskListSSE(res, 'step_start' as SSEEventType, taskList, {
                 stepNumber,
                 stepName: step?.name,
                 timestamp: new Date().toISOString(),
@@ -111,8 +160,7 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
         onStepComplete: (taskList: TaskList, stepNumber: number, result: unknown) => {
             const step = taskList.tasks.find(t => t.stepNumber === stepNumber);
             console.log('[SSE] 步骤完成:', stepNumber, step?.name);
-            sendSSE(res, 'step_complete' as SSEEventType, {
-                taskList,
+            sendTaskListSSE(res, 'step_complete' as SSEEventType, taskList, {
                 stepNumber,
                 stepName: step?.name,
                 resultSummary: step?.resultSummary,
@@ -122,8 +170,7 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
 
         onStepFailed: (taskList: TaskList, stepNumber: number, error: string) => {
             console.log('[SSE] 步骤失败:', stepNumber, error);
-            sendSSE(res, 'step_failed' as SSEEventType, {
-                taskList,
+            sendTaskListSSE(res, 'step_failed' as SSEEventType, taskList, {
                 stepNumber,
                 error,
                 timestamp: new Date().toISOString(),
@@ -150,6 +197,12 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
             });
         },
 
+        onMessageDelta: (delta: string) => {
+            sendSSE(res, 'ai_message_delta' as SSEEventType, {
+                delta,
+            });
+        },
+
         onMessage: (content: string) => {
             console.log('[SSE] AI 消息:', content.substring(0, 50) + '...');
             sendSSE(res, 'ai_message' as SSEEventType, {
@@ -160,8 +213,7 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
 
         onTaskComplete: (taskList: TaskList, finalContent: string) => {
             console.log('[SSE] 任务完成:', taskList.mapName);
-            sendSSE(res, 'task_complete' as SSEEventType, {
-                taskList,
+            sendTaskListSSE(res, 'task_complete' as SSEEventType, taskList, {
                 content: finalContent,
                 timestamp: new Date().toISOString(),
             });
@@ -207,7 +259,8 @@ export async function streamChat(req: Request, res: Response): Promise<void> {
             timestamp: new Date().toISOString(),
         });
     } finally {
-        // 结束流
+        // 发出缓冲中的事件后再结束流
+        flushSSE(res);
         res.end();
     }
 }
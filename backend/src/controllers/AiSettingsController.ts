@@ -5,6 +5,7 @@
 import { Response } from 'express';
 import axios from 'axios';
 import AiModel, { IAiModel } from '../models/AiModel';
+import { clearModelCache } from '../ai/agent/llm';
 
 // 使用 any 类型的 Request 以避免与其他地方的 user 类型扩展冲突
 type AuthRequest = any;
@@ -84,6 +85,7 @@ export const createAiModel = async (req: AuthRequest, res: Response) => {
     });
 
     await newModel.save();
+    clearModelCache();
 
     res.status(201).json({
       data: {
@@ -129,6 +131,7 @@ export const updateAiModel = async (req: AuthRequest, res: Response) => {
     if (isEnabled !== undefined) existingModel.isEnabled = isEnabled;
 
     await existingModel.save();
+    clearModelCache();
 
     return res.json({
       data: {
@@ -155,6 +158,7 @@ export const deleteAiModel = async (req: AuthRequest, res: Response) => {
       return res.status(404).json({ error: 'AI 模型不存在' });
     }
 
+    clearModelCache();
     return res.json({ message: '删除成功' });
   } catch (error) {
     console.error('删除 AI 模型失败:', error);
@@ -180,6 +184,7 @@ export const setDefaultModel = async (req: AuthRequest, res: Response) => {
       return res.status(404).json({ error: 'AI 模型不存在' });
     }
 
+    clearModelCache();
     return res.json({ data: model });
   } catch (error) {
     console.error('设置默认模型失败:', error);
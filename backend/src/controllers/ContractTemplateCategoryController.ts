@@ -29,26 +29,27 @@ class ContractTemplateCategoryController {
             const sort: any = {};
             sort[sortBy as string] = sortOrder === 'desc' ? -1 : 1;
 
-            const [categories, total] = await Promise.all([
+            // 分类列表、总数、按分类分组的模板计数彼此独立，并发执行；
+            // 一次 $group 聚合拿到所有分类的模板数，避免每个分类各发一次 count，
+            // lean() 直接返回普通对象，省掉 hydrate + toObject 的二次遍历
+            const [categories, total, templateCounts] = await Promise.all([
                 ContractTemplateCategory.find(query)
                     .sort(sort)
                     .skip(skip)
-                    .limit(Number(limit)),
-                ContractTemplateCategory.countDocuments(query)
+                    .limit(Number(limit))
+                    .lean(),
+                ContractTemplateCategory.countDocuments(query),
+                ContractTemplate.aggregate<{ _id: any; count: number }>([
+                    { $group: { _id: '$category', count: { $sum: 1 } } }
+                ])
             ]);
 
-            // 获取每个分类的模板数量
-            const categoriesWithCount = await Promise.all(
-                categories.map(async (category) => {
-                    const templateCount = await ContractTemplate.countDocuments({
-                        category: category._id
-                    });
-                    return {
-                        ...category.toObject(),
-                        templateCount
-                    };
-                })
-            );
+            const countByCategory = new Map(templateCounts.map(c => [String(c._id), c.count]));
+
+            const categoriesWithCount = categories.map(category => ({
+                ...category,
+                templateCount: countByCategory.get(String(category._id)) || 0
+            }));
 
             res.json({
                 success: true,
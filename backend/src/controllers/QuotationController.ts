@@ -1,5 +1,7 @@
 import { Request, Response } from 'express'
+import mongoose from 'mongoose'
 import QuotationService from '../services/QuotationService'
+import Client from '../models/Client'
 
 export class QuotationController {
     // 获取所有报价单
@@ -206,9 +208,38 @@ export class QuotationController {
         try {
             const { clientId } = req.params
 
-            // 先获取客户信息
-            const Client = require('../models/Client').default
-            const client = await Client.findById(clientId)
+            // 客户 → 报价单用一次 $lookup 聚合取回，省掉第二次网络往返；
+            // quotationId 以字符串存储，管道里转成 ObjectId 再关联
+            const [client] = await Client.aggregate<{ quotations: any[] }>([
+                { $match: { _id: new mongoose.Types.ObjectId(clientId) } },
+                { $project: { quotationId: 1 } },
+                {
+                    $lookup: {
+                        from: 'quotations',
+                        let: { qid: '$quotationId' },
+                        pipeline: [
+                            {
+                                $match: {
+                                    $expr: {
+                                        $eq: [
+                                            '$_id',
+                                            {
+                                                $convert: {
+                                                    input: '$$qid',
+                                                    to: 'objectId',
+                                                    onError: null,
+                                                    onNull: null
+                                                }
+                                            }
+                                        ]
+                                    }
+                                }
+                            }
+                        ],
+                        as: 'quotations'
+                    }
+                }
+            ])
 
             if (!client) {
                 return res.status(404).json({
@@ -217,21 +248,10 @@ export class QuotationController {
                 })
             }
 
-            // 如果客户有关联的报价单ID
-            if (client.quotationId) {
-                const quotation = await QuotationService.getQuotationById(client.quotationId)
-                if (quotation) {
-                    return res.json({
-                        success: true,
-                        data: [quotation]
-                    })
-                }
-            }
-
-            // 如果没有关联的报价单，返回空数组
+            // 没有关联报价单时 quotations 为空数组
             return res.json({
                 success: true,
-                data: []
+                data: client.quotations
             })
         } catch (error) {
             return res.status(500).json({
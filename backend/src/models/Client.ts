@@ -94,6 +94,17 @@ const ClientSchema = new Schema<IClient>({
     timestamps: true
 })
 
+// 文本索引：英文/拼音关键词搜索走倒排索引，避免全表正则扫描
+// （中文关键词默认分词器不支持，服务层会回退到正则）
+ClientSchema.index({ name: 'text', address: 'text' })
+
+// 复合索引：列表页常按 状态+分类 组合过滤，单字段索引只能覆盖其一
+ClientSchema.index({ status: 1, category: 1 })
+
+// 分类下按名称列举（AI 工具常见形态：{"category": ...} + 只取名称），
+// 查询和排序都落在索引上
+ClientSchema.index({ category: 1, name: 1 })
+
 
 
 export interface CreateClientRequest {
@@ -44,4 +44,14 @@ const QuotationSchema = new Schema<IQuotation>({
     }
 })
 
+// 报价单按名称搜索/查重
+QuotationSchema.index({ name: 1 })
+
+// 部分索引：默认报价查询只关心 isDefault=true 的那一条，
+// 索引体积与默认报价数量（通常为 1）成正比而不是全表
+QuotationSchema.index(
+    { isDefault: 1 },
+    { partialFilterExpression: { isDefault: true } }
+)
+
 export default mongoose.model<IQuotation>('Quotation', QuotationSchema) 
\ No newline at end of file
@@ -95,5 +95,7 @@ ServicePricingSchema.index({ serviceName: 1 })
 ServicePricingSchema.index({ alias: 1 })
 ServicePricingSchema.index({ categoryId: 1 })
 ServicePricingSchema.index({ status: 1 })
+// 复合索引：按 状态+分类 组合过滤时避免回表二次筛选
+ServicePricingSchema.index({ status: 1, categoryId: 1 })
 
 export default mongoose.model<IServicePricing>('ServicePricing', ServicePricingSchema) 
\ No newline at end of file
@@ -256,6 +256,8 @@ UserSchema.index({ 'employeeProfile.enterpriseId': 1 });
 UserSchema.index({ 'employeeProfile.departmentId': 1 });
 UserSchema.index({ 'clientContactProfile.clientId': 1 });
 UserSchema.index({ userTypes: 1 });
+// AI 工具按姓名查联系人（消歧义规则推荐 {"realName": ...} 查询）
+UserSchema.index({ realName: 1 });
 
 export default mongoose.model<IUser>('User', UserSchema)
 
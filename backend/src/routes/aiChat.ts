@@ -7,6 +7,7 @@
 import { Router, Request, Response, NextFunction } from 'express';
 import axios from 'axios';
 import AiModel from '../models/AiModel';
+import { llmHttp } from '../ai/agent/llm';
 
 const router = Router();
 
@@ -43,21 +44,21 @@ router.post('/chat', async (req: Request, res: Response, next: NextFunction) =>
     // 获取企业 ID（从认证的用户获取）
     const enterpriseId = (req as any).user?.enterpriseId;
 
-    // 查找默认 AI 模型配置
+    // 查找默认 AI 模型配置（一次查询带上 apiKey，避免二次 findById）
     let aiModel = null;
     if (enterpriseId) {
       aiModel = await AiModel.findOne({
         enterpriseId,
         isDefault: true,
         isEnabled: true,
-      });
+      }).select('+apiKey');
 
       // 如果没有默认模型，使用任何可用的模型
       if (!aiModel) {
         aiModel = await AiModel.findOne({
           enterpriseId,
           isEnabled: true,
-        });
+        }).select('+apiKey');
       }
     }
 
@@ -69,17 +70,15 @@ router.post('/chat', async (req: Request, res: Response, next: NextFunction) =>
     if (aiModel) {
       apiUrl = aiModel.baseUrl || DEFAULT_LMSTUDIO_URL;
       modelName = aiModel.model || modelName;
-      // 注意：API Key 默认不返回，需要显式选择
-      const fullModel = await AiModel.findById(aiModel._id).select('+apiKey');
-      if (fullModel?.apiKey) {
-        apiKey = fullModel.apiKey;
+      if (aiModel.apiKey) {
+        apiKey = aiModel.apiKey;
       }
     }
 
     console.log(`[AI Chat] 使用模型: ${modelName} @ ${apiUrl}`);
 
-    // 调用 LLM API (OpenAI 兼容格式)
-    const response = await axios.post(
+    // 调用 LLM API (OpenAI 兼容格式)，复用 Agent 的 keep-alive 连接池
+    const response = await llmHttp.post(
       `${apiUrl}/v1/chat/completions`,
       {
         model: modelName,
@@ -92,7 +91,8 @@ router.post('/chat', async (req: Request, res: Response, next: NextFunction) =>
           'Content-Type': 'application/json',
           ...(apiKey && { 'Authorization': `Bearer ${apiKey}` }),
         },
-        timeout: 60000, // 60 秒超时
+        // llmHttp 对非 2xx 不抛异常，这里沿用原有的 axios 错误分支
+        validateStatus: (status) => status >= 200 && status < 300,
       }
     );
 
@@ -131,6 +131,43 @@ async function initSchemaTools() {
                     required: ['keyword'],
                 },
             },
+            {
+                toolId: 'clients.batchGet',
+                name: '批量获取客户',
+                description: '按名称一次性获取多个客户。需要多个客户的信息时优先使用此工具，避免逐个查询的多轮往返。',
+                usage: `\`\`\`tool_call
+{"toolId": "clients.batchGet", "params": {"names": ["公司A", "公司B"]}}
+\`\`\``,
+                examples: `**一次取回多个客户**
+\`\`\`tool_call
+{"toolId": "clients.batchGet", "params": {"names": ["字节跳动", "西门子"]}}
+\`\`\`
+
+返回示例:
+{
+  "clients": { "字节跳动": {...}, "西门子": {...} },
+  "missing": [],
+  "message": "找到 2/2 个客户"
+}`,
+                category: 'schema',
+                enabled: true,
+                order: 3,
+                execution: {
+                    type: 'custom',
+                    handler: 'clientsBatchGet',
+                },
+                paramsSchema: {
+                    type: 'object',
+                    properties: {
+                        names: {
+                            type: 'array',
+                            description: '客户名称数组，最多 50 个',
+                            items: { type: 'string' },
+                        },
+                    },
+                    required: ['names'],
+                },
+            },
         ];
 
         console.log('\n📦 初始化 Schema 工具...');
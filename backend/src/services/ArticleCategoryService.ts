@@ -183,7 +183,7 @@ export class ArticleCategoryService {
     // 获取分类统计
     static async getCategoryStats(): Promise<{ total: number; active: number; totalArticles: number }> {
         const [total, active, totalArticles] = await Promise.all([
-            ArticleCategory.countDocuments(),
+            ArticleCategory.estimatedDocumentCount(),
             ArticleCategory.countDocuments({ isActive: true }),
             ArticleCategory.aggregate([
                 { $group: { _id: null, total: { $sum: '$articleCount' } } }
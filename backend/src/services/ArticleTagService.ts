@@ -111,7 +111,7 @@ export class ArticleTagService {
     // 获取标签统计
     static async getTagStats(): Promise<{ total: number; active: number; totalArticles: number }> {
         const [total, active, totalArticles] = await Promise.all([
-            ArticleTag.countDocuments(),
+            ArticleTag.estimatedDocumentCount(),
             ArticleTag.countDocuments({ isActive: true }),
             ArticleTag.aggregate([
                 { $group: { _id: null, total: { $sum: '$articleCount' } } }
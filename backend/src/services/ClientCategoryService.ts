@@ -1,25 +1,40 @@
 import ClientCategory, { IClientCategory, CreateClientCategoryRequest, UpdateClientCategoryRequest } from '../models/ClientCategory'
 import Client from '../models/Client'
 
+// 分类列表缓存：Agent 回合内会被反复查询，客户数统计允许 60 秒内的轻微滞后
+let categoriesCache: { categories: any[]; timestamp: number } | null = null
+const CATEGORIES_CACHE_TTL = 60 * 1000 // 60 秒
+
 export class ClientCategoryService {
+    // 清除分类列表缓存（任何写操作后调用）
+    private static clearCategoriesCache(): void {
+        categoriesCache = null
+    }
+
     static async getCategories(): Promise<any[]> {
+        if (categoriesCache
+            && Date.now() - categoriesCache.timestamp < CATEGORIES_CACHE_TTL) {
+            return categoriesCache.categories
+        }
+
         try {
-            const categories = await ClientCategory.find().sort({ createTime: -1 })
+            // 分类列表和按分类分组计数彼此独立，并发执行；
+            // 一次 $group 聚合拿到所有分类的客户数，避免每个分类各发一次 count
+            const [categories, counts] = await Promise.all([
+                ClientCategory.find().sort({ createTime: -1 }).lean(),
+                Client.aggregate<{ _id: string; count: number }>([
+                    { $group: { _id: '$category', count: { $sum: 1 } } }
+                ])
+            ])
 
-            // 为每个分类统计客户数量
-            const categoriesWithCount = await Promise.all(
-                categories.map(async (category) => {
-                    const clientCount = await Client.countDocuments({
-                        category: category.name
-                    })
-                    return {
-                        ...category.toObject(),
-                        clientCount
-                    }
-                })
-            )
+            const countByCategory = new Map(counts.map(c => [c._id, c.count]))
 
-            return categoriesWithCount
+            const result = categories.map(category => ({
+                ...category,
+                clientCount: countByCategory.get(category.name) || 0
+            }))
+            categoriesCache = { categories: result, timestamp: Date.now() }
+            return result
         } catch (error) {
             console.error('获取客户分类失败:', error)
             throw error
@@ -48,7 +63,9 @@ export class ClientCategoryService {
                 createTime: new Date().toISOString().slice(0, 10)
             })
 
-            return await newCategory.save()
+            const saved = await newCategory.save()
+            this.clearCategoriesCache()
+            return saved
         } catch (error) {
             console.error('创建客户分类失败:', error)
             throw error
@@ -74,6 +91,7 @@ export class ClientCategoryService {
                 { new: true }
             )
 
+            this.clearCategoriesCache()
             return updatedCategory
         } catch (error) {
             console.error('更新客户分类失败:', error)
@@ -84,6 +102,7 @@ export class ClientCategoryService {
     static async deleteCategory(id: string): Promise<boolean> {
         try {
             const result = await ClientCategory.findByIdAndDelete(id)
+            this.clearCategoriesCache()
             return !!result
         } catch (error) {
             console.error('删除客户分类失败:', error)
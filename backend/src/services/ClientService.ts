@@ -1,14 +1,22 @@
 import Client, { IClient, CreateClientRequest, UpdateClientRequest, ClientQuery } from '../models/Client'
 
+// 包含中日韩字符的关键词无法用 MongoDB 文本索引分词，需要回退到正则
+const CJK_RE = /[一-龥぀-ヿ가-힯]/
+
 export class ClientService {
     // 获取客户列表
     static async getClients(query: ClientQuery = {}): Promise<{ data: IClient[]; total: number }> {
         try {
             let filter: any = {}
 
-            // 搜索过滤
+            // 搜索过滤：非中文关键词走文本索引（倒排索引查询），
+            // 中文关键词保持正则匹配（文本索引默认分词器不支持中文）
             if (query.search) {
-                filter.name = { $regex: query.search, $options: 'i' }
+                if (CJK_RE.test(query.search)) {
+                    filter.name = { $regex: query.search, $options: 'i' }
+                } else {
+                    filter.$text = { $search: query.search }
+                }
             }
 
             // 状态过滤
@@ -21,17 +29,31 @@ export class ClientService {
                 filter.category = query.category
             }
 
-            const total = await Client.countDocuments(filter)
+            // 计数和取数彼此独立，并发执行
+            // 列表数据只读不改，用 lean() 跳过 Mongoose 文档实例化
+            const fetchPage = async (f: any): Promise<[number, IClient[]]> => {
+                let queryBuilder = Client.find(f).sort({ createTime: -1 })
 
-            // 分页
-            let queryBuilder = Client.find(filter).sort({ createTime: -1 })
+                if (query.page && query.limit) {
+                    const skip = (query.page - 1) * query.limit
+                    queryBuilder = queryBuilder.skip(skip).limit(query.limit)
+                }
 
-            if (query.page && query.limit) {
-                const skip = (query.page - 1) * query.limit
-                queryBuilder = queryBuilder.skip(skip).limit(query.limit)
+                return Promise.all([
+                    Client.countDocuments(f),
+                    queryBuilder.lean<IClient[]>().exec(),
+                ])
             }
 
-            const data = await queryBuilder.exec()
+            let [total, data] = await fetchPage(filter)
+
+            // 文本索引只匹配完整词元，部分名称（如 "Sie" 搜 "Siemens"）会落空；
+            // 命中为零时回退到正则子串匹配，保持搜索框原有的模糊语义
+            if (total === 0 && filter.$text) {
+                delete filter.$text
+                filter.name = { $regex: query.search, $options: 'i' };
+                [total, data] = await fetchPage(filter)
+            }
 
             return { data, total }
         } catch (error) {
@@ -9,6 +9,8 @@
  */
 
 import mongoose from 'mongoose';
+import fs from 'fs';
+import path from 'path';
 
 // ============================================================================
 // 类型定义
@@ -44,6 +46,17 @@ interface DataMap {
     lastUpdated: Date;
 }
 
+// 磁盘快照：进程重启后先用上次的结果兜底，
+// 首次 Schema 遍历完成前数据地图即可用
+const SNAPSHOT_PATH = path.join(__dirname, '../../.cache/datamap-snapshot.json');
+
+interface DataMapSnapshot {
+    tables: Array<[string, TableInfo]>;
+    relations: RelationInfo[];
+    relationGraph: Array<[string, string[]]>;
+    lastUpdated: string;
+}
+
 // ============================================================================
 // 中文名映射（可以后续改成从数据库读取）
 // ============================================================================
@@ -169,12 +182,16 @@ const DISAMBIGUATION_RULES: Record<string, {
 class DataMapService {
     private dataMap: DataMap | null = null;
     private refreshInterval: NodeJS.Timeout | null = null;
+    private refreshPromise: Promise<void> | null = null;
     private readonly CACHE_TTL = 60 * 60 * 1000; // 1 小时
 
     /**
      * 启动服务（开始定时刷新）
      */
     start(): void {
+        // 先尝试加载磁盘快照，避免首次构建完成前的空窗期
+        this.loadSnapshot();
+
         // 立即构建一次
         this.refresh().catch(err => {
             console.error('[DataMapService] 初始化失败:', err);
@@ -203,8 +220,22 @@ class DataMapService {
 
     /**
      * 刷新数据地图
+     *
+     * 并发调用（启动 + 定时器 + 手动触发）共享同一次构建，
+     * 避免重复遍历全部 Schema
      */
     async refresh(): Promise<void> {
+        if (this.refreshPromise) {
+            return this.refreshPromise;
+        }
+
+        this.refreshPromise = this.doRefresh().finally(() => {
+            this.refreshPromise = null;
+        });
+        return this.refreshPromise;
+    }
+
+    private async doRefresh(): Promise<void> {
         console.log('[DataMapService] 开始刷新数据地图...');
         
         // 确保所有模型被加载
@@ -287,6 +318,61 @@ class DataMapService {
         };
 
         console.log(`[DataMapService] 刷新完成，共 ${tables.size} 个表，${relations.length} 个关联`);
+
+        // 异步落盘，失败只影响下次启动的预热，不影响本次刷新
+        this.saveSnapshot().catch(err => {
+            console.warn('[DataMapService] 快照保存失败:', err);
+        });
+    }
+
+    /**
+     * 从磁盘加载上次的快照（仅在内存地图为空时使用）
+     */
+    private loadSnapshot(): void {
+        try {
+            if (!fs.existsSync(SNAPSHOT_PATH)) {
+                return;
+            }
+
+            const snapshot: DataMapSnapshot = JSON.parse(
+                fs.readFileSync(SNAPSHOT_PATH, 'utf-8')
+            );
+
+            this.dataMap = {
+                tables: new Map(snapshot.tables),
+                relations: snapshot.relations,
+                relationGraph: new Map(
+                    snapshot.relationGraph.map(([k, v]) => [k, new Set(v)])
+                ),
+                lastUpdated: new Date(snapshot.lastUpdated),
+            };
+
+            console.log(`[DataMapService] 已加载磁盘快照（${this.dataMap.tables.size} 个表，${snapshot.lastUpdated}）`);
+        } catch (err) {
+            console.warn('[DataMapService] 快照加载失败，等待首次刷新:', err);
+        }
+    }
+
+    /**
+     * 把当前数据地图写入磁盘（先写临时文件再改名，避免读到半截）
+     */
+    private async saveSnapshot(): Promise<void> {
+        if (!this.dataMap) {
+            return;
+        }
+
+        const snapshot: DataMapSnapshot = {
+            tables: Array.from(this.dataMap.tables.entries()),
+            relations: this.dataMap.relations,
+            relationGraph: Array.from(this.dataMap.relationGraph.entries())
+                .map(([k, v]) => [k, Array.from(v)] as [string, string[]]),
+            lastUpdated: this.dataMap.lastUpdated.toISOString(),
+        };
+
+        const tmpPath = `${SNAPSHOT_PATH}.tmp`;
+        await fs.promises.mkdir(path.dirname(SNAPSHOT_PATH), { recursive: true });
+        await fs.promises.writeFile(tmpPath, JSON.stringify(snapshot), 'utf-8');
+        await fs.promises.rename(tmpPath, SNAPSHOT_PATH);
     }
 
     /**
@@ -153,7 +153,7 @@ class FormCategoryService {
     // 获取分类统计信息
     async getCategoryStats() {
         const [total, active, totalForms] = await Promise.all([
-            FormCategory.countDocuments(),
+            FormCategory.estimatedDocumentCount(),
             FormCategory.countDocuments({ isActive: true }),
             FormCategory.aggregate([
                 { $group: { _id: null, total: { $sum: '$formCount' } } }
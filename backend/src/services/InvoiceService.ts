@@ -174,7 +174,7 @@ export class InvoiceService {
         const lastMonthEnd = new Date(now.getFullYear(), now.getMonth(), 0);
 
         const [total, totalAmountResult, thisMonthInvoices, lastMonthInvoices] = await Promise.all([
-            Invoice.countDocuments(),
+            Invoice.estimatedDocumentCount(),
             Invoice.aggregate([
                 {
                     $group: {
@@ -1,11 +1,25 @@
 import { PricingCategory, IPricingCategory, CreatePricingCategoryRequest, UpdatePricingCategoryRequest } from '../models/PricingCategory'
 
+// 分类列表缓存：被服务定价的创建/更新路径高频读取，而分类本身以人的节奏变化
+let categoriesCache: { categories: PricingCategory[]; timestamp: number } | null = null
+const CATEGORIES_CACHE_TTL = 60 * 1000 // 60 秒
+
 export class PricingCategoryService {
-    // 获取所有分类
+    // 清除分类列表缓存（任何写操作后调用）
+    private static clearCategoriesCache(): void {
+        categoriesCache = null
+    }
+
+    // 获取所有分类（带缓存）
     static async getCategories(): Promise<PricingCategory[]> {
+        if (categoriesCache
+            && Date.now() - categoriesCache.timestamp < CATEGORIES_CACHE_TTL) {
+            return categoriesCache.categories
+        }
+
         try {
             const categories = await PricingCategory.find().sort({ createTime: -1 })
-            return categories.map(category => ({
+            const result = categories.map(category => ({
                 _id: category._id?.toString() || '',
                 name: category.name,
                 description: category.description,
@@ -14,6 +28,8 @@ export class PricingCategoryService {
                 createTime: category.createTime.toLocaleDateString('zh-CN'),
                 updateTime: category.updateTime.toLocaleDateString('zh-CN')
             }))
+            categoriesCache = { categories: result, timestamp: Date.now() }
+            return result
         } catch (error) {
             throw new Error('获取定价分类列表失败')
         }
@@ -56,6 +72,7 @@ export class PricingCategoryService {
             })
 
             const savedCategory = await category.save()
+            this.clearCategoriesCache()
             return {
                 _id: savedCategory._id?.toString() || '',
                 name: savedCategory.name,
@@ -98,6 +115,7 @@ export class PricingCategoryService {
 
             if (!updatedCategory) return null
 
+            this.clearCategoriesCache()
             return {
                 _id: updatedCategory._id?.toString() || '',
                 name: updatedCategory.name,
@@ -119,6 +137,7 @@ export class PricingCategoryService {
     static async deleteCategory(id: string): Promise<boolean> {
         try {
             const result = await PricingCategory.findByIdAndDelete(id)
+            this.clearCategoriesCache()
             return !!result
         } catch (error) {
             throw new Error('删除定价分类失败')
@@ -140,6 +159,7 @@ export class PricingCategoryService {
 
             if (!updatedCategory) return null
 
+            this.clearCategoriesCache()
             return {
                 _id: updatedCategory._id?.toString() || '',
                 name: updatedCategory.name,
@@ -158,6 +178,7 @@ export class PricingCategoryService {
     static async updateServiceCount(id: string, count: number): Promise<void> {
         try {
             await PricingCategory.findByIdAndUpdate(id, { serviceCount: count })
+            this.clearCategoriesCache()
         } catch (error) {
             throw new Error('更新服务数量失败')
         }
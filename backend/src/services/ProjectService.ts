@@ -578,7 +578,7 @@ export class ProjectService {
       partialPaid,
       fullyPaid
     ] = await Promise.all([
-      Project.countDocuments(),
+      Project.estimatedDocumentCount(),
       Project.countDocuments({ progressStatus: 'consulting' }),
       Project.countDocuments({ progressStatus: 'in-progress' }),
       Project.countDocuments({ progressStatus: 'partial-delivery' }),
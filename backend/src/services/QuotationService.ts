@@ -1,9 +1,14 @@
 import Quotation, { IQuotation } from '../models/Quotation'
 
+// 默认报价单缓存：AI 工具链里会被高频查询，而默认报价以人的节奏变化
+let defaultQuotationCache: { quotation: IQuotation | null; timestamp: number } | null = null
+const DEFAULT_QUOTATION_TTL = 60 * 1000 // 60 秒
+
 export class QuotationService {
     // 获取所有报价单
+    // 列表数据只读不改，用 lean() 跳过 Mongoose 文档实例化
     async getAllQuotations(): Promise<IQuotation[]> {
-        return await Quotation.find().sort({ createTime: -1 })
+        return await Quotation.find().sort({ createTime: -1 }).lean<IQuotation[]>()
     }
 
     // 根据ID获取报价单
@@ -11,6 +16,11 @@ export class QuotationService {
         return await Quotation.findById(id)
     }
 
+    // 清除默认报价单缓存（任何可能影响默认报价的写操作后调用）
+    private clearDefaultCache(): void {
+        defaultQuotationCache = null
+    }
+
     // 创建报价单
     async createQuotation(data: {
         name: string
@@ -28,7 +38,9 @@ export class QuotationService {
         }
 
         const quotation = new Quotation(data)
-        return await quotation.save()
+        const saved = await quotation.save()
+        this.clearDefaultCache()
+        return saved
     }
 
     // 更新报价单
@@ -47,16 +59,19 @@ export class QuotationService {
             )
         }
 
-        return await Quotation.findByIdAndUpdate(
+        const updated = await Quotation.findByIdAndUpdate(
             id,
             data,
             { new: true, runValidators: true }
         )
+        this.clearDefaultCache()
+        return updated
     }
 
     // 删除报价单
     async deleteQuotation(id: string): Promise<boolean> {
         const result = await Quotation.findByIdAndDelete(id)
+        this.clearDefaultCache()
         return !!result
     }
 
@@ -68,7 +83,9 @@ export class QuotationService {
         }
 
         quotation.status = quotation.status === 'active' ? 'inactive' : 'active'
-        return await quotation.save()
+        const saved = await quotation.save()
+        this.clearDefaultCache()
+        return saved
     }
 
     // 搜索报价单
@@ -76,12 +93,19 @@ export class QuotationService {
         const regex = new RegExp(searchText, 'i')
         return await Quotation.find({
             name: regex
-        }).sort({ createTime: -1 })
+        }).sort({ createTime: -1 }).lean<IQuotation[]>()
     }
 
-    // 获取默认报价单
+    // 获取默认报价单（带缓存）
     async getDefaultQuotation(): Promise<IQuotation | null> {
-        return await Quotation.findOne({ isDefault: true })
+        if (defaultQuotationCache
+            && Date.now() - defaultQuotationCache.timestamp < DEFAULT_QUOTATION_TTL) {
+            return defaultQuotationCache.quotation
+        }
+
+        const quotation = await Quotation.findOne({ isDefault: true })
+        defaultQuotationCache = { quotation, timestamp: Date.now() }
+        return quotation
     }
 }
 
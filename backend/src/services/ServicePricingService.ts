@@ -4,6 +4,10 @@ import AdditionalConfig from '../models/AdditionalConfig'
 import ServiceProcess from '../models/ServiceProcess'
 import PricingPolicy from '../models/PricingPolicy'
 
+// ObjectId 的 24 位十六进制格式：$in 查询前先过滤掉非法 ID，
+// 避免单个脏 ID 让整批查询抛 CastError
+const OID_RE = /^[0-9a-fA-F]{24}$/
+
 export interface CreateServicePricingData {
     serviceName: string
     alias: string
@@ -32,9 +36,10 @@ export interface UpdateServicePricingData {
 
 export class ServicePricingService {
     // 获取所有服务定价
+    // 列表数据只读不改，用 lean() 跳过 Mongoose 文档实例化
     static async getAllServicePricing(): Promise<IServicePricing[]> {
         try {
-            return await ServicePricing.find().sort({ createTime: -1 })
+            return await ServicePricing.find().sort({ createTime: -1 }).lean<IServicePricing[]>()
         } catch (error) {
             throw new Error('获取服务定价列表失败')
         }
@@ -79,36 +84,48 @@ export class ServicePricingService {
     // 根据ID列表获取服务定价
     static async getServicePricingByIds(ids: string[]): Promise<IServicePricing[]> {
         try {
-            const servicePricingList = await ServicePricing.find({ _id: { $in: ids } })
-
-            // 确保每个服务定价都有完整的价格政策信息
-            const enrichedServicePricing = await Promise.all(
-                servicePricingList.map(async (service) => {
-                    // 如果已经有价格政策名称，直接返回
-                    if (service.pricingPolicyNames && service.pricingPolicyNames.length > 0) {
-                        return service
-                    }
-
-                    // 如果没有价格政策名称，但有价格政策ID，则获取名称
-                    if (service.pricingPolicyIds && service.pricingPolicyIds.length > 0) {
-                        const policies = await PricingPolicy.find({ _id: { $in: service.pricingPolicyIds } })
-                        const pricingPolicyNames = policies.map(policy => policy.name)
-
-                        // 更新服务定价的价格政策名称
-                        const updatedService = await ServicePricing.findByIdAndUpdate(
-                            service._id,
-                            { pricingPolicyNames: pricingPolicyNames },
-                            { new: true }
-                        )
-
-                        return updatedService || service
-                    }
-
-                    return service
-                })
+            // 一次性校验 ID 格式，单条 $in 查询走 _id 索引
+            const validIds = ids.filter(id => OID_RE.test(id))
+            if (validIds.length === 0) {
+                return []
+            }
+
+            const servicePricingList = await ServicePricing.find({ _id: { $in: validIds } })
+
+            // 找出需要回填价格政策名称的服务，把它们的政策 ID 汇总后
+            // 一次 $in 查询取回，避免每个服务各查一次（N+1）
+            const needEnrich = servicePricingList.filter(service =>
+                (!service.pricingPolicyNames || service.pricingPolicyNames.length === 0)
+                && service.pricingPolicyIds && service.pricingPolicyIds.length > 0
             )
 
-            return enrichedServicePricing as unknown as IServicePricing[]
+            if (needEnrich.length === 0) {
+                return servicePricingList
+            }
+
+            const allPolicyIds = [...new Set(needEnrich.flatMap(s => s.pricingPolicyIds || []))]
+                .filter(id => OID_RE.test(id))
+            const policies = await PricingPolicy.find({ _id: { $in: allPolicyIds } })
+                .select('name')
+                .lean<Array<{ _id: any; name: string }>>()
+            const policyNameById = new Map(policies.map(p => [String(p._id), p.name]))
+
+            // 批量回填名称（一次 bulkWrite 落库）
+            const bulkOps = needEnrich.map(service => {
+                const pricingPolicyNames = (service.pricingPolicyIds || [])
+                    .map(id => policyNameById.get(String(id)))
+                    .filter((name): name is string => !!name)
+                service.pricingPolicyNames = pricingPolicyNames
+                return {
+                    updateOne: {
+                        filter: { _id: service._id },
+                        update: { pricingPolicyNames },
+                    },
+                }
+            })
+            await ServicePricing.bulkWrite(bulkOps)
+
+            return servicePricingList
         } catch (error) {
             throw new Error('获取服务定价列表失败')
         }
@@ -223,7 +240,7 @@ export class ServicePricingService {
                     { alias: regex },
                     { priceDescription: regex }
                 ]
-            }).sort({ createTime: -1 })
+            }).sort({ createTime: -1 }).lean<IServicePricing[]>()
         } catch (error) {
             throw new Error('搜索服务定价失败')
         }